@@ -3,16 +3,29 @@ import asyncio
 import logging
 import signal
 import threading
+import time
+import queue
+import itertools
+import secrets
 from pathlib import Path
-from flask import Flask, jsonify, request, send_from_directory
+from flask import Flask, abort, jsonify, request
 from flask_cors import CORS
 from flask_socketio import SocketIO, emit, join_room
 import redis
 import mysql.connector
-from mysql.connector import errorcode
-import json
+import fastjsonschema
+from mysql.connector import errorcode, pooling
+import hashlib
+import mimetypes
 from datetime import datetime
 from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, wait as wait_futures
+from src.utils import serialization
+
+try:
+    import uvloop
+except ImportError:  # uvloop is not available on Windows
+    uvloop = None
 
 # --- Configuration ---
 # Configure logging
@@ -35,6 +48,7 @@ MYSQL_PASSWORD = os.environ.get('MYSQL_PASSWORD', 'traffic_password')
 APP_ENV = os.environ.get('APP_ENV', 'development')
 OUTPUT_DIR = Path(os.environ.get('OUTPUT_DIR', '/app/output'))
 LOGS_DIR = Path(os.environ.get('LOGS_DIR', '/app/logs'))
+STATIC_DIR = Path(os.environ.get('STATIC_DIR', Path(__file__).resolve().parent / 'static'))
 
 # Validate essential configuration
 if not SECRET_KEY and APP_ENV == 'production':
@@ -44,14 +58,18 @@ if not CORS_ALLOWED_ORIGINS and APP_ENV == 'production':
     logger.warning("Warning: CORS_ALLOWED_ORIGINS is not set. Allowing all origins.")
 
 # --- Application Initialization ---
-app = Flask(__name__, static_folder='static', static_url_path='')
+# Static files are served from an in-memory cache (see STATIC_CACHE), not Flask's static route.
+app = Flask(__name__, static_folder=None)
+app.json = serialization.OrjsonProvider(app)
 app.config['SECRET_KEY'] = SECRET_KEY or 'dev-secret-key-for-dev-only'
 
 # Enable CORS
 CORS(app, origins=CORS_ALLOWED_ORIGINS if APP_ENV == 'production' else "*")
 
 # Initialize SocketIO
-socketio = SocketIO(app, cors_allowed_origins=CORS_ALLOWED_ORIGINS if APP_ENV == 'production' else "*", async_mode='threading')
+# Simulations drive their own asyncio loops on native threads, which rules out eventlet/gevent
+# monkey patching; threading mode still gets a real WebSocket transport through simple-websocket.
+socketio = SocketIO(app, cors_allowed_origins=CORS_ALLOWED_ORIGINS if APP_ENV == 'production' else "*", async_mode='threading', json=serialization)
 
 # --- Service Connections ---
 # Initialize Redis connection
@@ -68,19 +86,44 @@ except Exception as e:
     logger.error(f"Redis connection failed: {e}")
     redis_client = None
 
-# Initialize MySQL connection
+# Initialize MySQL connection pool
+MYSQL_POOL_SIZE = int(os.environ.get('MYSQL_POOL_SIZE', 16))
+# Seconds a request waits for a free pooled connection before giving up.
+MYSQL_POOL_TIMEOUT = float(os.environ.get('MYSQL_POOL_TIMEOUT', 10))
+if not mysql.connector.HAVE_CEXT:
+    logger.warning("MySQL C extension not available, falling back to the pure-Python driver.")
+db_pool = None
+db_pool_lock = threading.Lock()
+# MySQLConnectionPool raises PoolError as soon as it is exhausted instead of waiting, and it caps out at
+# 32 connections, well below gunicorn's thread count. Checkouts queue on this semaphore instead.
+db_pool_slots = threading.BoundedSemaphore(MYSQL_POOL_SIZE)
+
+def get_db_pool():
+    """Create the MySQL connection pool on first use and reuse it afterwards."""
+    global db_pool
+    if db_pool is None:
+        with db_pool_lock:
+            if db_pool is None:
+                db_pool = pooling.MySQLConnectionPool(
+                    pool_name='tpt',
+                    pool_size=MYSQL_POOL_SIZE,
+                    host=MYSQL_HOST,
+                    port=MYSQL_PORT,
+                    database=MYSQL_DB,
+                    user=MYSQL_USER,
+                    password=MYSQL_PASSWORD
+                )
+                logger.info(f"MySQL connection pool established (size={MYSQL_POOL_SIZE})")
+    return db_pool
+
 @contextmanager
 def get_db_connection():
     """Provide a transactional scope around a series of operations."""
     conn = None
+    if not db_pool_slots.acquire(timeout=MYSQL_POOL_TIMEOUT):
+        raise mysql.connector.errors.PoolError(f"No MySQL connection became available within {MYSQL_POOL_TIMEOUT}s")
     try:
-        conn = mysql.connector.connect(
-            host=MYSQL_HOST,
-            port=MYSQL_PORT,
-            database=MYSQL_DB,
-            user=MYSQL_USER,
-            password=MYSQL_PASSWORD
-        )
+        conn = get_db_pool().get_connection()
         yield conn
     except mysql.connector.Error as err:
         if err.errno == errorcode.ER_ACCESS_DENIED_ERROR:
@@ -91,32 +134,314 @@ def get_db_connection():
             logger.error(f"Database connection failed: {err}")
         raise
     finally:
-        if conn and conn.is_connected():
+        # Closing a pooled connection returns it to the pool.
+        if conn:
             conn.close()
+        db_pool_slots.release()
+
+# --- SQL Statements ---
+SQL_INSERT_SIMULATION = "INSERT INTO simulations (id, config, status, created_at) VALUES (%s, %s, %s, %s)"
+SQL_UPDATE_SIMULATION_STATUS = """
+    UPDATE simulations SET
+        status = %s,
+        completed_at = COALESCE(%s, completed_at),
+        stats = COALESCE(%s, stats),
+        error_message = COALESCE(%s, error_message)
+    WHERE id = %s
+"""
+SQL_SELECT_SIMULATION = "SELECT id, status, created_at, completed_at, stats, error_message FROM simulations WHERE id = %s"
 
 # --- Core Application Imports ---
 from src.core.generator import AdvancedTrafficGenerator
 from src.core.config import TrafficConfig, DEFAULT_PERSONAS
 
 # --- Global State ---
-active_simulations = {}
+# Active simulations are split across shards, each guarded by its own lock, so status polls
+# for one simulation do not contend with writers finishing another.
+SIMULATION_SHARDS = 16
+simulation_shards = [(threading.Lock(), {}) for _ in range(SIMULATION_SHARDS)]
 simulation_threads = {}
 
+# Seeded with the start-up time so IDs stay unique across restarts; the suffix covers multiple workers.
+simulation_id_counter = itertools.count(int(time.time()))
+
+# Simulations run on a bounded worker pool; extra requests wait in the pool's queue.
+MAX_CONCURRENT_SIMS = int(os.environ.get('MAX_CONCURRENT_SIMS', 8))
+simulation_pool = ThreadPoolExecutor(max_workers=MAX_CONCURRENT_SIMS, thread_name_prefix='simulation')
+# Seconds graceful shutdown waits for running simulations to wind down before exiting anyway.
+SHUTDOWN_TIMEOUT = float(os.environ.get('SHUTDOWN_TIMEOUT', 30))
+# Each pool worker keeps one event loop and reuses it for every simulation it runs.
+worker_state = threading.local()
+
+# Live stats are pushed to the simulation room as 'stats_tick' at most once per interval (seconds).
+STATS_TICK_INTERVAL = float(os.environ.get('STATS_TICK_INTERVAL', 0.5))
+
+# Simulations in these states are immutable and safe to cache.
+TERMINAL_STATUSES = {'completed', 'failed', 'stopped'}
+
+# Serialized status responses of active simulations, keyed by (stats_version, status).
+status_cache = {}
+
+# Terminal records of finished simulations whose final status row has not been committed yet.
+# The status endpoint serves these so it never falls back to an older MySQL row.
+finished_simulations = {}
+
+# Simulation snapshots kept in Redis expire after this many seconds.
+SIMULATION_STATE_TTL = int(os.environ.get('SIMULATION_STATE_TTL', 3600))
+
+# Simulation status rows are queued and written to MySQL in batches by a background writer.
+STATUS_FLUSH_INTERVAL = float(os.environ.get('STATUS_FLUSH_INTERVAL', 0.1))
+STATUS_FLUSH_BATCH = int(os.environ.get('STATUS_FLUSH_BATCH', 1000))
+status_queue = queue.SimpleQueue()
+
+# Health probes are cached briefly so frequent monitoring polls share one DB/Redis round-trip.
+HEALTH_CACHE_TTL = float(os.environ.get('HEALTH_CACHE_TTL', 3))
+health_cache = {'ts': 0.0, 'body': None}
+health_cache_lock = threading.Lock()
+
+# --- Static Responses ---
+# These payloads never change at runtime, so they are serialized once at import.
+DEFAULT_CONFIG = {
+    'target_url': '',
+    'total_sessions': 100,
+    'max_concurrent': 10,
+    'headless': True,
+    'returning_visitor_rate': 30,
+    'navigation_timeout': 60000,
+    'max_retries_per_session': 2,
+    'mode_type': 'Bot',
+    'wait_state': 'domcontentloaded',
+    'wait_until': 'load',
+    'networkidle_timeout': 0,
+    'block_resources': True,
+    'block_analytics': False,
+    'scripted_interaction': True,
+    'network_type': 'Default',
+    'personas': DEFAULT_PERSONAS[:5],
+    'device_distribution': {'Desktop': 60, 'Mobile': 30, 'Tablet': 10},
+    'country_distribution': {'United States': 25, 'Indonesia': 15, 'India': 12, 'China': 10, 'Brazil': 8},
+    'age_distribution': {'18-24': 20, '25-34': 30, '35-44': 25, '45-54': 15, '55+': 10}
+}
+DEFAULT_CONFIG_BODY = app.json.dumps({'success': True, 'data': DEFAULT_CONFIG})
+DEFAULT_CONFIG_ETAG = hashlib.md5(DEFAULT_CONFIG_BODY.encode()).hexdigest()
+
+DEFAULT_PERSONAS_BODY = app.json.dumps({'success': True, 'data': [p.to_dict() for p in DEFAULT_PERSONAS]})
+DEFAULT_PERSONAS_ETAG = hashlib.md5(DEFAULT_PERSONAS_BODY.encode()).hexdigest()
+
+# Build output is read into memory once so SPA assets are served without touching the disk.
+def load_static_files(root):
+    """Read every file under the static folder into a {path: (data, mimetype, etag)} map."""
+    cache = {}
+    if not root.is_dir():
+        return cache
+    for file_path in root.rglob('*'):
+        if file_path.is_file():
+            data = file_path.read_bytes()
+            mimetype = mimetypes.guess_type(file_path.name)[0] or 'application/octet-stream'
+            cache[file_path.relative_to(root).as_posix()] = (data, mimetype, hashlib.md5(data).hexdigest())
+    return cache
+
+STATIC_CACHE = load_static_files(STATIC_DIR)
+# Next.js fingerprints everything under _next/static, so those files never change under the same URL.
+IMMUTABLE_STATIC_PREFIX = '_next/static/'
+
+# --- Validation ---
+# The schema is compiled once into a specialized validator function.
+CONFIG_SCHEMA = {
+    'type': 'object',
+    'required': ['target_url', 'total_sessions', 'max_concurrent'],
+    'properties': {
+        'target_url': {'type': 'string', 'pattern': '^https?://'},
+        'total_sessions': {'type': 'integer', 'minimum': 1, 'maximum': 10000},
+        'max_concurrent': {'type': 'integer', 'minimum': 1, 'maximum': 100}
+    }
+}
+validate_config_schema = fastjsonschema.compile(CONFIG_SCHEMA)
+CONFIG_VALIDATION_ERRORS = {
+    'data.target_url': 'Target URL must start with http:// or https://',
+    'data.total_sessions': 'Total sessions must be between 1 and 10,000',
+    'data.max_concurrent': 'Max concurrent sessions must be between 1 and 100'
+}
+
 # --- Utility Functions ---
-def run_simulation_in_background(simulation_id, config_data):
-    """Runs the traffic generation simulation in a separate thread."""
-    def simulation_runner():
-        loop = asyncio.new_event_loop()
+def get_cached_simulation_state(simulation_id):
+    """Return the JSON snapshot of a finished simulation from Redis, or None."""
+    if not redis_client:
+        return None
+    try:
+        return redis_client.get(f"sim:{simulation_id}")
+    except redis.RedisError as e:
+        logger.warning(f"Failed to read cached state for simulation {simulation_id}: {e}")
+        return None
+
+def simulation_record(row):
+    """Shape a finished simulation for the status endpoint, whether it comes from the runner or MySQL."""
+    stats = row.get('stats')
+    # MySQL hands JSON columns back as text.
+    if isinstance(stats, (str, bytes)):
+        stats = serialization.loads(stats)
+    return {
+        'id': row['id'],
+        'status': row['status'],
+        'created_at': row.get('created_at'),
+        'completed_at': row.get('completed_at'),
+        'stats': stats,
+        'error_message': row.get('error_message')
+    }
+
+def cache_simulation_state(simulation_id, state):
+    """Cache the snapshot of a finished simulation in Redis."""
+    if not redis_client:
+        return
+    try:
+        redis_client.set(f"sim:{simulation_id}", app.json.dumps(state), ex=SIMULATION_STATE_TTL)
+    except redis.RedisError as e:
+        logger.warning(f"Failed to cache state for simulation {simulation_id}: {e}")
+
+def simulation_shard(simulation_id):
+    """Return the (lock, dict) shard that holds a simulation."""
+    return simulation_shards[hash(simulation_id) % SIMULATION_SHARDS]
+
+def sim_get(simulation_id):
+    """Return the active simulation entry for an ID, or None."""
+    lock, shard = simulation_shard(simulation_id)
+    with lock:
+        return shard.get(simulation_id)
+
+def sim_put(simulation_id, sim):
+    """Register or replace an active simulation entry."""
+    lock, shard = simulation_shard(simulation_id)
+    with lock:
+        shard[simulation_id] = sim
+
+def sim_del(simulation_id):
+    """Remove an active simulation entry and its cached status response if present."""
+    lock, shard = simulation_shard(simulation_id)
+    with lock:
+        shard.pop(simulation_id, None)
+        status_cache.pop(simulation_id, None)
+
+def new_simulation_id():
+    """Return a unique simulation ID from a process-wide counter plus a random suffix."""
+    return f"sim_{next(simulation_id_counter):x}_{secrets.token_hex(3)}"
+
+def queue_simulation_insert(simulation_id, config, created_at):
+    """Queue the initial row of a new simulation for the next batched write."""
+    status_queue.put((simulation_id, SQL_INSERT_SIMULATION, (simulation_id, config, 'starting', created_at)))
+
+def queue_status_update(simulation_id, status, completed_at=None, stats=None, error_message=None):
+    """Queue a status change of an existing simulation row for the next batched write."""
+    status_queue.put((simulation_id, SQL_UPDATE_SIMULATION_STATUS,
+                      (status, completed_at, stats, error_message, simulation_id)))
+
+def drain_status_queue():
+    """Take up to STATUS_FLUSH_BATCH queued status rows without blocking."""
+    rows = []
+    while len(rows) < STATUS_FLUSH_BATCH:
+        try:
+            rows.append(status_queue.get_nowait())
+        except queue.Empty:
+            break
+    return rows
+
+def execute_status_rows(rows):
+    """Write queued rows in one transaction, batching consecutive rows that share a statement."""
+    with get_db_connection() as conn:
+        try:
+            with conn.cursor() as cur:
+                for sql, group in itertools.groupby(rows, key=lambda row: row[1]):
+                    cur.executemany(sql, [params for _, _, params in group])
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+    # MySQL now has the terminal rows, so their in-process copies can go.
+    for simulation_id, sql, params in rows:
+        if sql is SQL_UPDATE_SIMULATION_STATUS and params[0] in TERMINAL_STATUSES:
+            finished_simulations.pop(simulation_id, None)
+
+def write_status_updates(rows):
+    """Write a batch of simulation status rows, retrying row by row if the batch fails."""
+    try:
+        execute_status_rows(rows)
+        return
+    except Exception as e:
+        if len(rows) == 1:
+            logger.error(f"Failed to write status update for simulation {rows[0][0]}: {e}", exc_info=True)
+            return
+        logger.warning(f"Failed to write {len(rows)} simulation status updates, retrying one at a time: {e}")
+
+    # One bad row should not take the rest of the batch down with it.
+    for row in rows:
+        try:
+            execute_status_rows([row])
+        except Exception as e:
+            logger.error(f"Failed to write status update for simulation {row[0]}: {e}", exc_info=True)
+
+def status_writer():
+    """Flush queued status rows every STATUS_FLUSH_INTERVAL seconds."""
+    while True:
+        socketio.sleep(STATUS_FLUSH_INTERVAL)
+        rows = drain_status_queue()
+        if rows:
+            write_status_updates(rows)
+
+def cached_json_response(body, etag):
+    """Build a JSON response from a pre-serialized body, answering 304 when the ETag matches."""
+    response = app.response_class(body, mimetype='application/json')
+    response.set_etag(etag)
+    return response.make_conditional(request)
+
+def get_worker_loop():
+    """Return the event loop of the current worker thread, creating it on first use."""
+    loop = getattr(worker_state, 'loop', None)
+    if loop is None or loop.is_closed():
+        loop = uvloop.new_event_loop() if uvloop else asyncio.new_event_loop()
         asyncio.set_event_loop(loop)
+        worker_state.loop = loop
+    return loop
+
+def static_response(path):
+    """Serve a cached static file, falling back to index.html for client-side routes."""
+    if path not in STATIC_CACHE:
+        path = 'index.html'
+    if path not in STATIC_CACHE:
+        abort(404)
+
+    data, mimetype, etag = STATIC_CACHE[path]
+    response = app.response_class(data, mimetype=mimetype)
+    response.set_etag(etag)
+    if path.startswith(IMMUTABLE_STATIC_PREFIX):
+        response.headers['Cache-Control'] = 'public, max-age=31536000, immutable'
+    else:
+        response.headers['Cache-Control'] = 'no-cache'
+    return response.make_conditional(request)
+
+def run_simulation_in_background(simulation_id, config_data, created_at):
+    """Runs the traffic generation simulation on the shared simulation worker pool."""
+    def simulation_runner():
+        loop = get_worker_loop()
         try:
             config = TrafficConfig(project_root=OUTPUT_DIR.parent, **config_data)
-            generator = AdvancedTrafficGenerator(config)
+            generator = AdvancedTrafficGenerator(
+                config,
+                on_stats=lambda stats: socketio.emit(
+                    'stats_tick', {'id': simulation_id, 'stats': stats}, to=simulation_id
+                ),
+                stats_interval=STATS_TICK_INTERVAL
+            )
             
-            active_simulations[simulation_id] = {
-                'generator': generator,
-                'status': 'running',
-                'started_at': datetime.utcnow()
-            }
+            # A stop may have arrived while the simulation was queued; the shard lock orders it
+            # against this hand-off so the request is never lost.
+            lock, shard = simulation_shard(simulation_id)
+            with lock:
+                entry = shard[simulation_id]
+                entry['generator'] = generator
+                entry['started_at'] = datetime.utcnow()
+                if entry['status'] == 'stopping':
+                    generator.stop()
+                else:
+                    entry['status'] = 'running'
             
             socketio.emit('simulation_started', {'simulation_id': simulation_id})
             logger.info(f"Simulation {simulation_id} started.")
@@ -124,14 +449,15 @@ def run_simulation_in_background(simulation_id, config_data):
             loop.run_until_complete(generator.run())
             
             status = 'completed' if not generator.stop_event.is_set() else 'stopped'
-            active_simulations[simulation_id]['status'] = status
+            sim_get(simulation_id)['status'] = status
             
-            with get_db_connection() as conn:
-                with conn.cursor(dictionary=True) as cur:
-                    cur.execute("UPDATE simulations SET status = %s, finished_at = %s, stats = %s WHERE id = %s",
-                                (status, datetime.utcnow(), json.dumps(generator.session_stats), simulation_id))
-                    conn.commit()
-
+            finish_simulation(simulation_record({
+                'id': simulation_id,
+                'status': status,
+                'created_at': created_at,
+                'completed_at': datetime.utcnow(),
+                'stats': generator.session_stats
+            }))
             socketio.emit('simulation_completed', {
                 'simulation_id': simulation_id,
                 'stats': generator.session_stats
@@ -140,40 +466,63 @@ def run_simulation_in_background(simulation_id, config_data):
 
         except Exception as e:
             logger.error(f"Simulation {simulation_id} failed: {e}", exc_info=True)
-            active_simulations[simulation_id]['status'] = 'failed'
-            with get_db_connection() as conn:
-                with conn.cursor(dictionary=True) as cur:
-                    cur.execute("UPDATE simulations SET status = %s, finished_at = %s, error_message = %s WHERE id = %s",
-                                ('failed', datetime.utcnow(), str(e), simulation_id))
-                    conn.commit()
+            # The config may fail to load before the simulation is registered.
+            entry = sim_get(simulation_id)
+            if entry:
+                entry['status'] = 'failed'
+            finish_simulation(simulation_record({
+                'id': simulation_id,
+                'status': 'failed',
+                'created_at': created_at,
+                'completed_at': datetime.utcnow(),
+                'error_message': str(e)
+            }))
             socketio.emit('simulation_error', {'simulation_id': simulation_id, 'error': str(e)})
         finally:
-            loop.close()
+            # Finished simulations are served from finished_simulations, Redis or MySQL from here on.
+            sim_del(simulation_id)
             if simulation_id in simulation_threads:
                 del simulation_threads[simulation_id]
 
-    thread = threading.Thread(target=simulation_runner)
-    thread.daemon = True
-    thread.start()
-    simulation_threads[simulation_id] = thread
+    # Registered before it is submitted so a simulation waiting for a pool worker can be seen and stopped.
+    sim_put(simulation_id, {
+        'generator': None,
+        'status': 'queued',
+        'created_at': created_at,
+        'started_at': None
+    })
+    simulation_threads[simulation_id] = simulation_pool.submit(simulation_runner)
 
-# --- API Endpoints ---
-@app.route('/')
-def index():
-    """Serve the Next.js frontend's entry point."""
-    return send_from_directory(app.static_folder, 'index.html')
+def finish_simulation(record):
+    """Record a simulation's terminal state; it is served from memory until the writer commits it."""
+    simulation_id = record['id']
+    # Published before the row is queued, so the writer cannot commit and release it first.
+    finished_simulations[simulation_id] = app.json.dumps(record)
+    stats = app.json.dumps(record['stats']) if record['stats'] is not None else None
+    queue_status_update(simulation_id, record['status'], completed_at=record['completed_at'],
+                        stats=stats, error_message=record['error_message'])
+    cache_simulation_state(simulation_id, record)
 
-@app.route('/<path:path>')
-def serve_static(path):
-    """Serve static files from the Next.js build directory."""
-    try:
-        return send_from_directory(app.static_folder, path)
-    except FileNotFoundError:
-        return send_from_directory(app.static_folder, 'index.html')
+def cancel_queued_simulation(simulation_id):
+    """Cancel a simulation that has not reached a pool worker yet. Returns False once it has started."""
+    future = simulation_threads.get(simulation_id)
+    if future is None or not future.cancel():
+        return False
 
-@app.route('/api/health')
-def health_check():
-    """Health check endpoint for monitoring."""
+    entry = sim_get(simulation_id)
+    finish_simulation(simulation_record({
+        'id': simulation_id,
+        'status': 'stopped',
+        'created_at': entry['created_at'] if entry else None,
+        'completed_at': datetime.utcnow()
+    }))
+    sim_del(simulation_id)
+    simulation_threads.pop(simulation_id, None)
+    logger.info(f"Simulation {simulation_id} cancelled before it started.")
+    return True
+
+def probe_services():
+    """Check connectivity to MySQL and Redis and build the health status payload."""
     db_ok = False
     try:
         with get_db_connection() as conn:
@@ -181,40 +530,48 @@ def health_check():
                 db_ok = True
     except Exception:
         db_ok = False
-        
-    status = {
+
+    try:
+        redis_ok = bool(redis_client and redis_client.ping())
+    except Exception:
+        redis_ok = False
+
+    return {
         'status': 'healthy',
         'timestamp': datetime.utcnow().isoformat(),
         'services': {
-            'redis': 'connected' if redis_client and redis_client.ping() else 'disconnected',
+            'redis': 'connected' if redis_ok else 'disconnected',
             'mysql': 'connected' if db_ok else 'disconnected'
         }
     }
-    return jsonify(status)
+
+socketio.start_background_task(status_writer)
+
+# --- API Endpoints ---
+@app.route('/')
+def index():
+    """Serve the Next.js frontend's entry point."""
+    return static_response('index.html')
+
+@app.route('/<path:path>')
+def serve_static(path):
+    """Serve static files from the Next.js build directory."""
+    return static_response(path)
+
+@app.route('/api/health')
+def health_check():
+    """Health check endpoint for monitoring."""
+    with health_cache_lock:
+        if health_cache['body'] is None or time.monotonic() - health_cache['ts'] >= HEALTH_CACHE_TTL:
+            health_cache['body'] = jsonify(probe_services()).get_data()
+            health_cache['ts'] = time.monotonic()
+        body = health_cache['body']
+    return app.response_class(body, mimetype='application/json')
 
 @app.route('/api/config/default')
 def get_default_config():
     """Get default simulation configuration."""
-    try:
-        config = {
-            'target_url': '',
-            'total_sessions': 100,
-            'max_concurrent': 10,
-            'headless': True,
-            'returning_visitor_rate': 30,
-            'navigation_timeout': 60000,
-            'max_retries_per_session': 2,
-            'mode_type': 'Bot',
-            'network_type': 'Default',
-            'personas': DEFAULT_PERSONAS[:5],
-            'device_distribution': {'Desktop': 60, 'Mobile': 30, 'Tablet': 10},
-            'country_distribution': {'United States': 25, 'Indonesia': 15, 'India': 12, 'China': 10, 'Brazil': 8},
-            'age_distribution': {'18-24': 20, '25-34': 30, '35-44': 25, '45-54': 15, '55+': 10}
-        }
-        return jsonify({'success': True, 'data': config})
-    except Exception as e:
-        logger.error(f"Error getting default config: {e}", exc_info=True)
-        return jsonify({'success': False, 'error': 'Failed to retrieve default configuration.'}), 500
+    return cached_json_response(DEFAULT_CONFIG_BODY, DEFAULT_CONFIG_ETAG)
 
 @app.route('/api/config/validate', methods=['POST'])
 def validate_config():
@@ -224,21 +581,15 @@ def validate_config():
         if not config_data:
             return jsonify({'success': False, 'error': 'Request body must be JSON.'}), 400
 
-        required_fields = ['target_url', 'total_sessions', 'max_concurrent']
-        for field in required_fields:
-            if field not in config_data:
-                return jsonify({'success': False, 'error': f'Missing required field: {field}'}), 400
-        
-        if not config_data['target_url'].startswith(('http://', 'https://')):
-            return jsonify({'success': False, 'error': 'Target URL must start with http:// or https://'}), 400
-        
-        if not (1 <= config_data['total_sessions'] <= 10000):
-            return jsonify({'success': False, 'error': 'Total sessions must be between 1 and 10,000'}), 400
-        
-        if not (1 <= config_data['max_concurrent'] <= 100):
-            return jsonify({'success': False, 'error': 'Max concurrent sessions must be between 1 and 100'}), 400
-        
+        validate_config_schema(config_data)
         return jsonify({'success': True, 'data': True})
+    except fastjsonschema.JsonSchemaValueException as e:
+        if e.rule == 'required':
+            missing = next(field for field in CONFIG_SCHEMA['required'] if field not in config_data)
+            error = f'Missing required field: {missing}'
+        else:
+            error = CONFIG_VALIDATION_ERRORS.get(e.name, e.message)
+        return jsonify({'success': False, 'error': error}), 400
     except Exception as e:
         logger.error(f"Error validating config: {e}", exc_info=True)
         return jsonify({'success': False, 'error': 'An unexpected error occurred during validation.'}), 500
@@ -247,22 +598,21 @@ def validate_config():
 def start_simulation():
     """Start a new traffic simulation."""
     try:
-        config_data = request.get_json()
+        # Parse the raw body once and store it verbatim instead of re-serializing the parsed config.
+        raw_config = request.get_data()
+        try:
+            config_data = serialization.loads(raw_config) if request.is_json and raw_config else None
+        except ValueError:
+            config_data = None
         if not config_data:
             return jsonify({'success': False, 'error': 'Request body must be JSON.'}), 400
             
-        simulation_id = f"sim_{int(datetime.utcnow().timestamp())}"
+        simulation_id = new_simulation_id()
         
-        with get_db_connection() as conn:
-            with conn.cursor() as cur:
-                # Note: Always use query parameterization to prevent SQL injection.
-                cur.execute("""
-                    INSERT INTO simulations (id, config, status, created_at)
-                    VALUES (%s, %s, %s, %s)
-                """, (simulation_id, json.dumps(config_data), 'starting', datetime.utcnow()))
-                conn.commit()
+        created_at = datetime.utcnow()
+        queue_simulation_insert(simulation_id, raw_config.decode(), created_at)
         
-        run_simulation_in_background(simulation_id, config_data)
+        run_simulation_in_background(simulation_id, config_data, created_at)
         
         return jsonify({'success': True, 'data': {'simulation_id': simulation_id}}), 202
         
@@ -272,28 +622,52 @@ def start_simulation():
 
 @app.route('/api/simulation/<simulation_id>/status')
 def get_simulation_status(simulation_id):
-    """Get the status of a specific simulation."""
+    """Get the status of a specific simulation.
+
+    Clients in the simulation room receive live 'stats_tick' pushes; this endpoint is
+    meant for the initial fetch and for resyncing after a reconnect, not for polling.
+    """
     try:
-        if simulation_id in active_simulations:
-            sim = active_simulations[simulation_id]
+        sim = sim_get(simulation_id)
+        if sim:
             generator = sim.get('generator')
-            stats = generator.session_stats if generator else {}
-            return jsonify({
-                'success': True,
-                'data': {
-                    'id': simulation_id,
-                    'status': sim['status'],
-                    'started_at': sim['started_at'].isoformat(),
-                    'stats': stats
-                }
-            })
+            cache_key = (generator.stats_version if generator else 0, sim['status'])
+            cached = status_cache.get(simulation_id)
+            if cached is None or cached[0] != cache_key:
+                stats = generator.session_stats if generator else {}
+                body = app.json.dumps({
+                    'success': True,
+                    'data': {
+                        'id': simulation_id,
+                        'status': sim['status'],
+                        'started_at': sim['started_at'].isoformat() if sim['started_at'] else None,
+                        'stats': stats
+                    }
+                })
+                cached = (cache_key, body)
+                # Only cache while the simulation is still active; sim_del clears the entry under
+                # the same lock, so a response built as the run finishes cannot linger afterwards.
+                lock, shard = simulation_shard(simulation_id)
+                with lock:
+                    if simulation_id in shard:
+                        status_cache[simulation_id] = cached
+            return app.response_class(cached[1], mimetype='application/json')
         else:
+            # Finished simulations never change, so their snapshot is served straight from memory
+            # until the final row is committed, and from Redis afterwards.
+            cached_state = finished_simulations.get(simulation_id) or get_cached_simulation_state(simulation_id)
+            if cached_state:
+                return app.response_class(f'{{"success":true,"data":{cached_state}}}', mimetype='application/json')
+
             with get_db_connection() as conn:
                 with conn.cursor(dictionary=True) as cur:
-                    cur.execute("SELECT id, status, created_at, finished_at, stats, error_message FROM simulations WHERE id = %s", (simulation_id,))
+                    cur.execute(SQL_SELECT_SIMULATION, (simulation_id,))
                     result = cur.fetchone()
                     if result:
-                        return jsonify({'success': True, 'data': result})
+                        record = simulation_record(result)
+                        if record['status'] in TERMINAL_STATUSES:
+                            cache_simulation_state(simulation_id, record)
+                        return jsonify({'success': True, 'data': record})
             
             return jsonify({'success': False, 'error': 'Simulation not found'}), 404
             
@@ -305,12 +679,18 @@ def get_simulation_status(simulation_id):
 def stop_simulation(simulation_id):
     """Stop a running simulation."""
     try:
-        if simulation_id in active_simulations:
-            sim = active_simulations[simulation_id]
-            generator = sim.get('generator')
-            if generator and hasattr(generator, 'stop_event'):
-                generator.stop_event.set()
-            sim['status'] = 'stopping'
+        # Marked under the shard lock so a simulation leaving the queue right now still sees the stop.
+        lock, shard = simulation_shard(simulation_id)
+        with lock:
+            sim = shard.get(simulation_id)
+            if sim:
+                sim['status'] = 'stopping'
+                generator = sim['generator']
+        if sim:
+            if generator:
+                generator.stop()
+            else:
+                cancel_queued_simulation(simulation_id)
             
             socketio.emit('simulation_stopping', {'simulation_id': simulation_id})
             logger.info(f"Stopping simulation {simulation_id}...")
@@ -326,12 +706,7 @@ def stop_simulation(simulation_id):
 @app.route('/api/personas/default')
 def get_default_personas():
     """Get the list of default personas."""
-    try:
-        personas = [p.to_dict() for p in DEFAULT_PERSONAS]
-        return jsonify({'success': True, 'data': personas})
-    except Exception as e:
-        logger.error(f"Error getting default personas: {e}", exc_info=True)
-        return jsonify({'success': False, 'error': 'Failed to retrieve personas.'}), 500
+    return cached_json_response(DEFAULT_PERSONAS_BODY, DEFAULT_PERSONAS_ETAG)
 
 # --- WebSocket Handlers ---
 @socketio.on('connect')
@@ -357,15 +732,27 @@ def handle_join_simulation(data):
 # --- Graceful Shutdown ---
 def graceful_shutdown(signum, frame):
     logger.info("Shutdown signal received. Stopping all simulations...")
-    for sim_id, sim_data in active_simulations.items():
-        generator = sim_data.get('generator')
-        if generator:
-            generator.stop_event.set()
+    for simulation_id in list(simulation_threads):
+        if not cancel_queued_simulation(simulation_id):
+            sim_data = sim_get(simulation_id)
+            generator = sim_data.get('generator') if sim_data else None
+            if generator:
+                generator.stop()
     
-    # Wait for threads to finish
-    for thread in simulation_threads.values():
-        thread.join(timeout=10)
+    # Give running simulations a bounded time to finish; the queue was already drained above
+    running = list(simulation_threads.values())
+    simulation_pool.shutdown(wait=False, cancel_futures=True)
+    _, not_done = wait_futures(running, timeout=SHUTDOWN_TIMEOUT)
+
+    # Persist any status updates the background writer has not flushed yet
+    pending = drain_status_queue()
+    if pending:
+        write_status_updates(pending)
 
+    if not_done:
+        # Pool threads are joined at interpreter exit, so a stuck run would block a normal exit.
+        logger.warning(f"{len(not_done)} simulations did not stop within {SHUTDOWN_TIMEOUT}s. Exiting anyway.")
+        os._exit(1)
     logger.info("All simulations stopped. Exiting.")
     exit(0)
 
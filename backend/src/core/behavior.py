@@ -1,23 +1,173 @@
 # File: src/core/behavior.py
 
 import asyncio
+import json
 import logging
+import re
 import time
 from random import choice, choices, randint, uniform
-from typing import Any, Dict, List, Tuple
-from urllib.parse import urljoin, urlparse
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
 from abc import ABC, abstractmethod
+from functools import lru_cache
 
 from faker import Faker
-from playwright.async_api import ElementHandle, Locator, Page, TimeoutError as PlaywrightTimeoutError
+from playwright.async_api import BrowserContext, ElementHandle, Locator, Page, Route, TimeoutError as PlaywrightTimeoutError
+
+try:
+    import ahocorasick
+except ImportError:  # fall back to per-keyword substring checks
+    ahocorasick = None
 
 from .config import Persona, TrafficConfig
 from .fingerprint import BrowserFingerprint
 
 logger = logging.getLogger(__name__)
 
+# Reads every anchor matched by a locator in a single evaluate; index lines up with locator.nth().
+# Hidden, mailto/tel and off-site links are dropped in the page so they never cross the CDP boundary,
+# text is truncated since keyword matching does not need whole article bodies, and both strings come
+# back lowercased, ready for keyword matching.
+LINK_DATA_SCRIPT = """(links, baseHost) => links.map((a, index) => {
+    const rawHref = a.getAttribute("href") || "";
+    if (!rawHref || rawHref.startsWith("mailto:") || rawHref.startsWith("tel:")) return null;
+    let host;
+    try { host = new URL(a.href).host; } catch (e) { return null; }
+    if (host !== baseHost) return null;
+    const rect = a.getBoundingClientRect();
+    if (rect.width === 0 || rect.height === 0 || getComputedStyle(a).visibility === "hidden") return null;
+    return { index, href: a.href.toLowerCase(), text: (a.textContent || "").slice(0, 200).toLowerCase() };
+}).filter(Boolean)"""
+
+# Replays a pre-generated interaction plan in the page with one evaluate instead of a CDP call per step.
+# The events are synthetic (isTrusted is false), so TrafficConfig.scripted_interaction can switch back to
+# native Playwright input for sites that care.
+HUMAN_INTERACTION_SCRIPT = """async ({ moves, scrolls }) => {
+    const sleep = ms => new Promise(resolve => setTimeout(resolve, ms));
+    let x = 0, y = 0;
+    for (const move of moves) {
+        for (let step = 1; step <= move.steps; step++) {
+            const clientX = x + (move.x - x) * step / move.steps;
+            const clientY = y + (move.y - y) * step / move.steps;
+            const target = document.elementFromPoint(clientX, clientY) || document;
+            target.dispatchEvent(new MouseEvent("mousemove", { clientX, clientY, bubbles: true }));
+            await new Promise(requestAnimationFrame);
+        }
+        x = move.x;
+        y = move.y;
+        await sleep(move.delay);
+    }
+    for (const scroll of scrolls) {
+        window.dispatchEvent(new WheelEvent("wheel", { deltaY: scroll.dy, bubbles: true }));
+        window.scrollBy(0, scroll.dy);
+        await sleep(scroll.delay);
+    }
+}"""
+
+# Registered on the context so LCP and CLS are buffered from the first paint of every page.
+WEB_VITALS_OBSERVER_SCRIPT = """(() => {
+    window.__vitals = { lcp: null, cls: 0 };
+    try {
+        new PerformanceObserver(list => {
+            for (const entry of list.getEntries()) window.__vitals.lcp = entry.startTime;
+        }).observe({ type: "largest-contentful-paint", buffered: true });
+        new PerformanceObserver(list => {
+            for (const entry of list.getEntries()) if (!entry.hadRecentInput) window.__vitals.cls += entry.value;
+        }).observe({ type: "layout-shift", buffered: true });
+    } catch (e) {}
+})();"""
+
+# Reads navigation timing, paint timing and the observed LCP/CLS in one evaluate. Metrics that are
+# not available yet come back as null instead of discarding the whole read.
+WEB_VITALS_SCRIPT = """() => {
+    const nav = performance.getEntriesByType("navigation")[0];
+    if (!nav) return null;
+    const fcp = performance.getEntriesByName("first-contentful-paint")[0];
+    const observed = window.__vitals || {};
+    return {
+        ttfb: nav.responseStart - nav.requestStart,
+        fcp: fcp ? fcp.startTime : null,
+        domLoad: nav.domContentLoadedEventEnd ? nav.domContentLoadedEventEnd - nav.startTime : null,
+        pageLoad: nav.loadEventEnd ? nav.loadEventEnd - nav.startTime : null,
+        lcp: observed.lcp ?? null,
+        cls: observed.cls ?? null,
+    };
+}"""
+
+DEFAULT_FORM_SELECTOR = "form:visible"
+FORM_INPUT_SELECTOR = "input[type='text'], input[type='email'], textarea"
+
+# Everything _fill_input_element needs for every form field, read in one round trip; index lines up
+# with locator.nth() and hidden fields are dropped in the page.
+FORM_FIELDS_SCRIPT = """fields => fields.map((el, index) => {
+    const rect = el.getBoundingClientRect();
+    if (rect.width === 0 || rect.height === 0 || getComputedStyle(el).visibility === "hidden") return null;
+    return {
+        index,
+        name: (el.getAttribute("name") || "").toLowerCase(),
+        type: (el.getAttribute("type") || "").toLowerCase(),
+        tag: el.tagName.toLowerCase(),
+    };
+}).filter(Boolean)"""
+# Resources the simulated visitor never needs. Not applied when collecting web vitals, since images,
+# fonts and CSS all feed into FCP and LCP.
+BLOCKED_RESOURCE_TYPES = frozenset({"image", "font", "media", "stylesheet"})
+BLOCKED_HOSTS_PATTERN = re.compile(r"google-analytics\.com|googletagmanager\.com|doubleclick\.net|hotjar\.com|segment\.(?:io|com)")
+
+# Faker loads its locale providers on construction, so one instance per locale is shared by all simulators.
+FAKER_LOCALES = ("id_ID", "en_US")
+FAKER_INSTANCES: Dict[str, Faker] = {}
+
+def get_faker(locale: str) -> Faker:
+    """Returns the shared Faker instance for a locale, creating it on first use."""
+    faker = FAKER_INSTANCES.get(locale)
+    if faker is None:
+        faker = FAKER_INSTANCES[locale] = Faker(locale)
+    return faker
+
+def build_keyword_matcher(persona: Persona) -> Any:
+    """Precomputes the keyword matcher for a persona, or returns None if it has no keywords.
+
+    With pyahocorasick installed this is an automaton scanning all keywords in one pass; otherwise it
+    is a tuple of (lowercased keyword, weight) pairs so the fallback never re-merges or re-lowercases.
+    """
+    keywords = {**persona.goal_keywords, **persona.generic_keywords}
+    if not keywords:
+        return None
+    # Scored text is lowercased, so keywords are normalized once here to match.
+    scored_keywords = tuple((keyword.lower(), weight) for keyword, weight in keywords.items())
+    if ahocorasick is None:
+        return scored_keywords
+    automaton = ahocorasick.Automaton()
+    for keyword, weight in scored_keywords:
+        automaton.add_word(keyword, (keyword, weight))
+    automaton.make_automaton()
+    return automaton
+
+@lru_cache(maxsize=None)
+def find_and_click_selector(target_text: str) -> str:
+    """Builds the link/button selector for a find_and_click target once per distinct target."""
+    # json.dumps produces a double-quoted string literal for the selector engine. Non-ASCII text stays
+    # literal: the selector parser uses CSS escapes, so a JSON \uXXXX escape would not round-trip.
+    pattern = json.dumps(target_text, ensure_ascii=False)
+    return f'a:text-matches({pattern}, "i"), button:text-matches({pattern}, "i")'
+
+def format_ms(value: Any) -> str:
+    """Formats a millisecond metric for logging, tolerating missing values."""
+    return f"{value:.0f}ms" if value is not None else "n/a"
+
 # --- Mission Strategy Pattern ---
 
+# Filled at import time by @register_mission; maps goal["type"] to its Mission class.
+MISSIONS: Dict[str, type] = {}
+
+def register_mission(mission_type: str):
+    """Class decorator that registers a Mission subclass for a goal type."""
+    def decorator(cls):
+        MISSIONS[mission_type] = cls
+        return cls
+    return decorator
+
 class Mission(ABC):
     """Abstract base class for a persona's mission."""
     def __init__(self, simulator: 'IntelligentBehaviorSimulator', page: Page, persona: Persona, goal: Dict[str, Any]):
@@ -32,9 +182,10 @@ class Mission(ABC):
         """Executes the mission and returns the result."""
         pass
 
-    async def _navigate_to_next_page(self) -> bool:
-        """Finds and clicks a relevant link to navigate to a new page."""
-        scored_links = await self.simulator._score_links(self.page, self.persona)
+    async def _navigate_to_next_page(self, scored_links: Optional[List[Tuple[Locator, int]]] = None) -> bool:
+        """Finds and clicks a relevant link to navigate to a new page, optionally from pre-scored links."""
+        if scored_links is None:
+            scored_links = await self.simulator._score_links(self.page, self.persona)
         if not scored_links:
             logger.info("No relevant links found to continue mission.")
             return False
@@ -43,24 +194,33 @@ class Mission(ABC):
         chosen_link = choices(links, weights=weights, k=1)[0]
         try:
             await chosen_link.click(delay=self.simulator.delays["click_delay"])
-            await self.page.wait_for_load_state("networkidle", timeout=self.simulator.config.navigation_timeout)
+            await self.simulator._wait_for_page(self.page, self.persona)
             # await self.simulator._capture_ga4_event(self.page, self.profile_id, self.ga4_events, "page_view")
             return True
         except PlaywrightTimeoutError as e:
             logger.warning(f"Failed to navigate to next page during mission: {e}")
             return False
 
+@register_mission("collect_web_vitals")
 class CollectWebVitalsMission(Mission):
     """Mission to collect web vitals from a series of pages."""
     async def execute(self) -> Dict[str, Any]:
         all_vitals = []
         pages_to_visit = self.goal.get("pages_to_visit", 3)
         for i in range(pages_to_visit):
-            vitals = await self.simulator._execute_goal_collect_web_vitals(self.page)
+            is_last_page = i == pages_to_visit - 1
+            if is_last_page:
+                vitals = await self.simulator._execute_goal_collect_web_vitals(self.page)
+            else:
+                # Both only read the current page, so link scoring overlaps the vitals read.
+                vitals, scored_links = await asyncio.gather(
+                    self.simulator._execute_goal_collect_web_vitals(self.page),
+                    self.simulator._score_links(self.page, self.persona),
+                )
             if vitals:
                 all_vitals.append(vitals)
             
-            if i < pages_to_visit - 1 and not await self._navigate_to_next_page():
+            if not is_last_page and not await self._navigate_to_next_page(scored_links):
                 break
         
         self.result["status"] = "completed"
@@ -69,6 +229,7 @@ class CollectWebVitalsMission(Mission):
         logger.info(f"Mission 'collect_web_vitals' completed. Analyzed {len(all_vitals)} pages.")
         return self.result
 
+@register_mission("find_and_click")
 class FindAndClickMission(Mission):
     """Mission to find a specific element by text and click it."""
     async def execute(self) -> Dict[str, Any]:
@@ -77,25 +238,29 @@ class FindAndClickMission(Mission):
             self.result["details"]["error_message"] = "Target text for 'find_and_click' not specified."
             return self.result
 
-        target_locator = self.page.locator(f'a:text-matches("{target_text}", "i"), button:text-matches("{target_text}", "i")').first
+        target_locator = self.page.locator(find_and_click_selector(target_text)).first
         try:
-            if await target_locator.is_visible(timeout=5000):
-                logger.info(f"Target '{target_text}' found, clicking...")
-                await target_locator.click(delay=self.simulator.delays["click_delay"])
-                await self.page.wait_for_load_state("networkidle", timeout=self.simulator.config.navigation_timeout)
-                self.result["status"] = "completed"
-                self.result["mission_accomplished"] = True
-            else:
-                self.result["details"]["error_message"] = f"Target '{target_text}' not found or not visible."
+            # click() auto-waits for the target to be visible, so no separate is_visible round trip.
+            await target_locator.click(timeout=5000, delay=self.simulator.delays["click_delay"])
         except PlaywrightTimeoutError:
-            self.result["details"]["error_message"] = f"Timed out waiting for target '{target_text}' to be visible."
+            self.result["details"]["error_message"] = f"Target '{target_text}' not found or not visible."
+            return self.result
+
+        logger.info(f"Target '{target_text}' clicked.")
+        try:
+            await self.simulator._wait_for_page(self.page, self.persona)
+            self.result["status"] = "completed"
+            self.result["mission_accomplished"] = True
+        except PlaywrightTimeoutError:
+            self.result["details"]["error_message"] = f"Timed out waiting for the page after clicking '{target_text}'."
         return self.result
 
+@register_mission("fill_form")
 class FillFormMission(Mission):
     """Mission to find and fill a form."""
     async def execute(self) -> Dict[str, Any]:
-        selector = self.goal.get("target_selector", "form:visible")
-        form_filled = await self.simulator._handle_form_interaction(self.page, selector)
+        form_locator = self.page.locator(self.goal.get("target_selector", DEFAULT_FORM_SELECTOR)).first
+        form_filled = await self.simulator._handle_form_interaction(self.page, self.persona, form_locator)
         if form_filled:
             self.result["status"] = "completed"
             self.result["mission_accomplished"] = True
@@ -106,58 +271,87 @@ class FillFormMission(Mission):
 class IntelligentBehaviorSimulator:
     """Simulates user behavior based on a given persona."""
 
-    MISSION_MAPPING = {
-        "collect_web_vitals": CollectWebVitalsMission,
-        "find_and_click": FindAndClickMission,
-        "fill_form": FillFormMission,
-    }
-
     def __init__(self, config: TrafficConfig, mode_type: str = "Bot"):
         self.config = config
         self.mode_type = mode_type or getattr(config, 'mode_type', 'Bot')
-        self.faker = Faker(choice(["id_ID", "en_US"]))
+        # Lowercased to match the host reported by the browser's URL parser.
+        self.base_netloc = urlparse(config.target_url).netloc.lower()
+        # Keyed by id() since personas are frozen, unhashable and live as long as the config.
+        self.keyword_matchers: Dict[int, Any] = {}
+        self.faker = get_faker(choice(FAKER_LOCALES))
         self.delays = BrowserFingerprint.add_realistic_delays() if self.mode_type == "Human" else {
             "typing_delay": 10, "click_delay": 10, "scroll_delay": 0.01,
             "page_load_wait_min": 0.1, "page_load_wait_max": 0.2,
             "interaction_pause": 0.01, "human_pause": 0.01,
         }
 
+    async def install_vitals_observer(self, context: BrowserContext, persona: Persona):
+        """Starts LCP/CLS observers on every page of the context for web vitals missions."""
+        if (persona.goal or {}).get("type") == "collect_web_vitals":
+            await context.add_init_script(WEB_VITALS_OBSERVER_SCRIPT)
+
+    async def install_routes(self, context: BrowserContext, persona: Persona):
+        """Aborts requests for heavy resources and analytics hosts for every page in the context."""
+        collects_vitals = (persona.goal or {}).get("type") == "collect_web_vitals"
+        block_resources = self.config.block_resources and not collects_vitals
+        if not block_resources and not self.config.block_analytics:
+            return
+        blocked_types = BLOCKED_RESOURCE_TYPES if block_resources else frozenset()
+        blocked_hosts = BLOCKED_HOSTS_PATTERN if self.config.block_analytics else None
+
+        async def handle_route(route: Route):
+            request = route.request
+            if request.resource_type in blocked_types or (blocked_hosts and blocked_hosts.search(request.url)):
+                await route.abort()
+            else:
+                await route.continue_()
+
+        await context.route("**/*", handle_route)
+
+    def _keyword_score(self, persona: Persona, text: str) -> int:
+        """Sums the weights of the distinct persona keywords found in text with a single scan."""
+        key = id(persona)
+        if key not in self.keyword_matchers:
+            self.keyword_matchers[key] = build_keyword_matcher(persona)
+        matcher = self.keyword_matchers[key]
+        if matcher is None:
+            return 0
+        if isinstance(matcher, tuple):
+            return sum(weight for keyword, weight in matcher if keyword in text)
+        return sum(dict(match for _, match in matcher.iter(text)).values())
+
     async def _score_links(self, page: Page, persona: Persona) -> List[Tuple[Locator, int]]:
-        """Scores visible links based on their relevance to the persona."""
-        visible_links = await page.locator("a[href]:visible").all()
+        """Scores visible links based on their relevance to the persona, in document order."""
+        all_links = page.locator("a[href]")
+        # One round trip for every link; only visible same-site links come back.
+        link_data = await all_links.evaluate_all(LINK_DATA_SCRIPT, self.base_netloc)
         scored_links = []
-        base_netloc = urlparse(self.config.target_url).netloc
-        keywords_to_check = {**persona.goal_keywords, **persona.generic_keywords}
-
-        for link in visible_links:
-            href = await link.get_attribute("href")
-            if not href or href.startswith(("mailto:", "tel:")):
-                continue
-            
-            full_url = urljoin(page.url, href)
-            if urlparse(full_url).netloc != base_netloc:
-                continue
 
-            link_text = (await link.text_content() or "").lower()
-            score = sum(weight for keyword, weight in keywords_to_check.items() if keyword in link_text or keyword in full_url.lower())
+        for link in link_data:
+            # Text and URL are scanned together; the newline keeps keywords from matching across them.
+            score = self._keyword_score(persona, f"{link['text']}\n{link['href']}")
             
             if score > 0:
-                scored_links.append((link, 1 + score))
+                # Locators are lazy, so this costs nothing until the chosen link is clicked.
+                scored_links.append((all_links.nth(link["index"]), 1 + score))
         
-        return sorted(scored_links, key=lambda x: x[1], reverse=True)
+        # Callers sample with random.choices, which only needs the weights, so no sort is needed.
+        return scored_links
 
-    async def _fill_input_element(self, input_elem: Locator):
-        """Fills a single input element with data from Faker."""
-        if not await input_elem.is_visible(): return
-        input_name = (await input_elem.get_attribute("name") or "").lower()
-        input_type = (await input_elem.get_attribute("type") or "").lower()
-        tag = await input_elem.evaluate("el => el.tagName.toLowerCase()")
+    async def _wait_for_page(self, page: Page, persona: Persona, timeout: Optional[int] = None):
+        """Waits for the load state the persona needs after a navigation."""
+        wait_state = (persona.goal or {}).get("wait_state", self.config.wait_state)
+        await page.wait_for_load_state(wait_state, timeout=timeout or self.config.navigation_timeout)
 
-        if "email" in input_name or input_type == "email":
+    async def _fill_input_element(self, input_elem: Locator, info: Dict[str, Any]):
+        """Fills a single input element with data from Faker, based on its pre-read attributes."""
+        input_name = info["name"]
+
+        if "email" in input_name or info["type"] == "email":
             fill_value = self.faker.email()
         elif "name" in input_name:
             fill_value = self.faker.name()
-        elif tag == "textarea":
+        elif info["tag"] == "textarea":
             fill_value = self.faker.paragraph(nb_sentences=randint(2, 4))
         else:
             fill_value = self.faker.company()
@@ -165,29 +359,34 @@ class IntelligentBehaviorSimulator:
         await input_elem.fill(fill_value, timeout=5000)
         await asyncio.sleep(self.delays["typing_delay"] / 1000)
 
-    async def _handle_form_interaction(self, page: Page, selector: str) -> bool:
-        """Finds, fills, and submits a form. Returns True on success."""
+    async def _handle_form_interaction(self, page: Page, persona: Persona, form_locator: Locator) -> bool:
+        """Fills and submits the form matched by form_locator. Returns True on success."""
         try:
-            form_locator = page.locator(selector).first
-            if not await form_locator.is_visible():
-                logger.debug(f"No visible form found for selector '{selector}'.")
+            # Reading the fields doubles as the form check: no visible fields means no usable form,
+            # and evaluate_all returns immediately instead of waiting out an action timeout.
+            inputs = form_locator.locator(FORM_INPUT_SELECTOR)
+            fields = await inputs.evaluate_all(FORM_FIELDS_SCRIPT)
+            if not fields:
+                logger.debug("No visible form found.")
                 return False
 
             logger.info("Form detected, attempting to interact.")
-            for input_type in ["input[type='text']", "input[type='email']", "textarea"]:
-                for input_elem in await form_locator.locator(input_type).all():
-                    await self._fill_input_element(input_elem)
+            # One field at a time: fill() focuses its element and types through the page keyboard.
+            for field in fields:
+                await self._fill_input_element(inputs.nth(field["index"]), field)
 
             submit_button = form_locator.locator("button[type='submit'], input[type='submit']").first
-            if await submit_button.is_visible():
-                logger.info("Submitting form...")
-                await submit_button.click(delay=self.delays["click_delay"])
-                await page.wait_for_load_state("networkidle", timeout=15000)
-                logger.info("Form submitted successfully.")
-                return True
-            
-            logger.debug("Submit button not found or not visible on the form.")
-            return False
+            try:
+                # click() auto-waits for visibility, so no separate is_visible round trip.
+                await submit_button.click(timeout=5000, delay=self.delays["click_delay"])
+            except PlaywrightTimeoutError:
+                logger.debug("Submit button not found or not visible on the form.")
+                return False
+
+            logger.info("Form submitted, waiting for the page...")
+            await self._wait_for_page(page, persona, timeout=15000)
+            logger.info("Form submitted successfully.")
+            return True
         except PlaywrightTimeoutError as e:
             logger.warning(f"Failed to interact with form: {e}", exc_info=True)
             return False
@@ -195,19 +394,10 @@ class IntelligentBehaviorSimulator:
     async def _execute_goal_collect_web_vitals(self, page: Page) -> Dict[str, Any]:
         """Evaluates and returns page performance metrics."""
         try:
-            vitals = await page.evaluate("""() => {
-                const nav = performance.getEntriesByType('navigation')[0];
-                if (!nav) return null;
-                const fcp = performance.getEntriesByName('first-contentful-paint')[0];
-                return {
-                    ttfb: nav.responseStart - nav.requestStart,
-                    fcp: fcp ? fcp.startTime : null,
-                    domLoad: nav.domContentLoadedEventEnd - nav.startTime,
-                    pageLoad: nav.loadEventEnd - nav.startTime
-                };
-            }""")
-            if vitals and all(v is not None for v in vitals.values()):
-                logger.info(f"Web vitals collected: TTFB={vitals['ttfb']:.0f}ms, FCP={vitals['fcp']:.0f}ms")
+            vitals = await page.evaluate(WEB_VITALS_SCRIPT)
+            if vitals:
+                logger.info(f"Web vitals collected: TTFB={format_ms(vitals['ttfb'])}, "
+                            f"FCP={format_ms(vitals['fcp'])}, LCP={format_ms(vitals['lcp'])}")
                 vitals["url"] = page.url
                 return vitals
         except PlaywrightTimeoutError as e:
@@ -220,7 +410,7 @@ class IntelligentBehaviorSimulator:
         mission_type = goal.get("type")
         logger.info(f"Starting mission '{mission_type}' for persona '{persona.name}'.")
 
-        mission_class = self.MISSION_MAPPING.get(mission_type)
+        mission_class = MISSIONS.get(mission_type)
         if not mission_class:
             logger.warning(f"Unknown mission type: {mission_type}")
             return {"status": "failed", "details": {"error_message": f"Unknown mission type: {mission_type}"}}
@@ -232,11 +422,31 @@ class IntelligentBehaviorSimulator:
             logger.error(f"An unexpected error occurred during mission '{mission_type}': {e}", exc_info=True)
             return {"status": "failed", "details": {"error_message": str(e)}, "mission_accomplished": False}
 
+    def _plan_human_interaction(self, viewport: Dict[str, int]) -> Dict[str, List[Dict[str, float]]]:
+        """Pre-generates the random mouse moves and scroll steps for HUMAN_INTERACTION_SCRIPT."""
+        moves = [
+            {"x": randint(0, viewport['width']-1), "y": randint(0, viewport['height']-1),
+             "steps": randint(5, 20), "delay": uniform(100, 400)}
+            for _ in range(randint(2, 5))
+        ]
+        scrolls = []
+        scroll_amount = 0
+        max_scroll = viewport['height'] * uniform(1.0, 2.5)
+        while scroll_amount < max_scroll:
+            scroll_delta = randint(80, 300)
+            scrolls.append({"dy": scroll_delta, "delay": uniform(200, 700)})
+            scroll_amount += scroll_delta
+        return {"moves": moves, "scrolls": scrolls}
+
     async def _simulate_human_interaction(self, page: Page):
         """Simulates human-like mouse movements and scrolling."""
         if self.mode_type != "Human": return
 
         viewport = page.viewport_size or {'width': 1920, 'height': 1080}
+
+        if self.config.scripted_interaction:
+            await page.evaluate(HUMAN_INTERACTION_SCRIPT, self._plan_human_interaction(viewport))
+            return
         
         # Mouse movements
         for _ in range(randint(2, 5)):
@@ -261,7 +471,7 @@ class IntelligentBehaviorSimulator:
             
             if persona.can_fill_forms and uniform(0, 1) < 0.25:
                 logger.debug("Attempting random form interaction.")
-                await self._handle_form_interaction(page, "form:visible")
+                await self._handle_form_interaction(page, persona, page.locator(DEFAULT_FORM_SELECTOR).first)
             
             scored_links = await self._score_links(page, persona)
             if not scored_links:
@@ -276,7 +486,7 @@ class IntelligentBehaviorSimulator:
                 await chosen_link.hover()
                 await asyncio.sleep(uniform(0.2, 0.7))
                 await chosen_link.click(delay=self.delays["click_delay"])
-                await page.wait_for_load_state("networkidle", timeout=self.config.navigation_timeout)
+                await self._wait_for_page(page, persona)
             except PlaywrightTimeoutError as e:
                 logger.warning(f"Failed to click link or load page: {e}. Stopping standard navigation.")
                 break
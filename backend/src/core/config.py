@@ -1,6 +1,7 @@
 # src/core/config.py
 
 from dataclasses import dataclass, field
+from itertools import accumulate
 from pathlib import Path
 from typing import Any, Optional, List, Dict, Tuple
 import random
@@ -12,7 +13,14 @@ DEFAULT_REFERRER_SOURCES = [
     "https://t.co/", "https://www.facebook.com/", "https://linkedin.com/",
 ]
 
-@dataclass
+LOAD_STATES = ("load", "domcontentloaded", "networkidle")
+
+def cumulative_weights(distribution: Dict[str, int]) -> Tuple[List[str], List[int]]:
+    """Splits a distribution into its population and cumulative weights for random.choices."""
+    return list(distribution), list(accumulate(distribution.values()))
+
+# Personas are shared read-only by every session of a run; per-session demographics live outside them.
+@dataclass(frozen=True, slots=True)
 class Persona:
     name: str
     goal_keywords: Dict[str, int] = field(default_factory=dict)
@@ -40,7 +48,7 @@ class Persona:
             "age_range": self.age_range,
         }
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class TrafficConfig:
     project_root: Path
     target_url: str
@@ -58,6 +66,21 @@ class TrafficConfig:
     age_distribution: Dict[str, int] = field(default_factory=lambda: {"18-24": 20, "25-34": 30, "35-44": 25, "45-54": 15, "55+": 10})
     referrer_sources: List[str] = field(default_factory=lambda: DEFAULT_REFERRER_SOURCES)
     mode_type: str = "Bot"
+    # Load state awaited after each in-page navigation; personas can override it via goal["wait_state"].
+    wait_state: str = "domcontentloaded"
+    # Load state for the initial page.goto, plus an optional bounded networkidle wait in ms (0 disables).
+    wait_until: str = "load"
+    networkidle_timeout: int = 0
+    block_resources: bool = True
+    # Off by default: analytics hits are often how target sites measure the generated traffic.
+    block_analytics: bool = False
+    # Replay Human-mode mouse/scroll plans in-page rather than one Playwright input call per step.
+    scripted_interaction: bool = True
+    # (population, cumulative weights) pairs derived from the distributions in __post_init__.
+    gender_weights: Tuple[List[str], List[int]] = field(init=False, repr=False, compare=False)
+    device_weights: Tuple[List[str], List[int]] = field(init=False, repr=False, compare=False)
+    age_weights: Tuple[List[str], List[int]] = field(init=False, repr=False, compare=False)
+    country_weights: Tuple[List[str], List[int]] = field(init=False, repr=False, compare=False)
 
     def __post_init__(self):
         """Validate configuration after initialization."""
@@ -76,6 +99,15 @@ class TrafficConfig:
         if not (0 <= self.returning_visitor_rate <= 100):
             raise ValueError("returning_visitor_rate must be between 0 and 100.")
 
+        if self.wait_state not in LOAD_STATES:
+            raise ValueError("wait_state must be one of 'load', 'domcontentloaded' or 'networkidle'.")
+
+        if self.wait_until not in LOAD_STATES + ("commit",):
+            raise ValueError("wait_until must be one of 'commit', 'load', 'domcontentloaded' or 'networkidle'.")
+
+        if self.networkidle_timeout < 0:
+            raise ValueError("networkidle_timeout cannot be negative.")
+
         if not self.personas:
             raise ValueError("At least one persona must be defined.")
 
@@ -90,6 +122,13 @@ class TrafficConfig:
         validate_distribution(self.age_distribution, "age_distribution")
         # country_distribution is validated by its source
 
+        # Sampled once per session, so the cumulative weights are built once here.
+        # The config is frozen, so derived fields are set through object.__setattr__.
+        object.__setattr__(self, "gender_weights", cumulative_weights(self.gender_distribution))
+        object.__setattr__(self, "device_weights", cumulative_weights(self.device_distribution))
+        object.__setattr__(self, "age_weights", cumulative_weights(self.age_distribution))
+        object.__setattr__(self, "country_weights", cumulative_weights(self.country_distribution))
+
 DEFAULT_PERSONAS = [
     Persona(
         name="Methodical Customer",
@@ -110,7 +149,7 @@ DEFAULT_PERSONAS = [
         goal_keywords={"home": 10, "about": 8, "products": 9, "blog": 7},
         generic_keywords={"news": 5, "contact": 6},
         navigation_depth=(5, 8), avg_time_per_page=(10, 20), can_fill_forms=False,
-        goal={"type": "collect_web_vitals", "pages_to_visit": 5},
+        goal={"type": "collect_web_vitals", "pages_to_visit": 5, "wait_state": "load"},
     ),
     Persona(
         name="Quick Browser",
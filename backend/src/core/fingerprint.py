@@ -1,5 +1,57 @@
-from random import choice, randint, uniform, choices
-from typing import Dict, List, Optional, Tuple, Union
+import random
+from dataclasses import dataclass
+from random import Random
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+
+def build_alias_table(weights: Sequence[float]) -> Tuple[List[float], List[int]]:
+    """Builds a Vose alias table so a weighted index can be drawn in O(1) with one random()."""
+    n = len(weights)
+    total = sum(weights)
+    scaled = [w * n / total for w in weights]
+    prob, alias = [1.0] * n, list(range(n))
+    small = [i for i, p in enumerate(scaled) if p < 1.0]
+    large = [i for i, p in enumerate(scaled) if p >= 1.0]
+    while small and large:
+        s, l = small.pop(), large.pop()
+        prob[s], alias[s] = scaled[s], l
+        scaled[l] -= 1.0 - scaled[s]
+        (small if scaled[l] < 1.0 else large).append(l)
+    # Whatever is left is 1.0 up to float error and keeps its own index.
+    return prob, alias
+
+
+@dataclass(frozen=True, slots=True)
+class Fingerprint:
+    """A generated browser identity for one session."""
+    device_name: str
+    user_agent: str
+    viewport: Dict[str, int]
+    is_mobile: bool
+    has_touch: bool
+    device_scale_factor: float
+    hardware_concurrency: int
+    device_memory: int
+    locale: str
+    timezone_id: str
+    country: str
+    color_scheme: str
+    reduced_motion: str
+    age: Optional[int] = None
+
+    def context_args(self) -> Dict[str, Any]:
+        """Returns the fields that are passed straight through to browser.new_context()."""
+        return {
+            "user_agent": self.user_agent,
+            "viewport": self.viewport,
+            "locale": self.locale,
+            "timezone_id": self.timezone_id,
+            "is_mobile": self.is_mobile,
+            "has_touch": self.has_touch,
+            "device_scale_factor": self.device_scale_factor,
+            "color_scheme": self.color_scheme,
+            "reduced_motion": self.reduced_motion,
+        }
 
 
 class BrowserFingerprint:
@@ -102,6 +154,20 @@ class BrowserFingerprint:
         "South Korea": {"locales": ["ko-KR,ko;q=0.9,en;q=0.8"], "timezones": ["Asia/Seoul"], "weight": 8},
     }
 
+    # Item tuples built once so draws index directly instead of materializing list(dict.items()) per call.
+    DESKTOP_OS_ITEMS = tuple(DESKTOP_OS_FINGERPRINTS.items())
+    MOBILE_ITEMS = tuple(MOBILE_FINGERPRINTS.values())
+    TABLET_ITEMS = tuple(TABLET_FINGERPRINTS.values())
+
+    # Alias table over COUNTRY_DATA for random country draws; indexes line up with COUNTRY_NAMES.
+    COUNTRY_NAMES = list(COUNTRY_DATA)
+    COUNTRY_PROB, COUNTRY_ALIAS = build_alias_table([data["weight"] for data in COUNTRY_DATA.values()])
+    # Every (locale, timezone) combination per country: one draw picks both, none when there is a single pair.
+    COUNTRY_PAIRS = {
+        name: tuple((locale, timezone) for locale in data["locales"] for timezone in data["timezones"])
+        for name, data in COUNTRY_DATA.items()
+    }
+
     DEFAULT_LOCALE = "en-US,en;q=0.9"
     DEFAULT_TIMEZONE = "America/New_York"
     
@@ -118,55 +184,61 @@ class BrowserFingerprint:
         device_type: str = "Desktop",
         country: Optional[str] = None,
         age_range: Optional[Tuple[int, int]] = None,
-    ) -> dict:
+        rng: Optional[Random] = None,
+    ) -> Fingerprint:
         """
         Generate a random browser fingerprint based on device type, country, and age range.
+        Draws come from rng when given (one per session worker), else from the random module.
         """
+        rng = rng or random
         if device_type == "Mobile":
-            fingerprint_base = BrowserFingerprint._get_mobile()
+            fingerprint_base = BrowserFingerprint._get_mobile(rng)
         elif device_type == "Tablet":
-            fingerprint_base = BrowserFingerprint._get_tablet()
+            fingerprint_base = BrowserFingerprint._get_tablet(rng)
         else:
-            fingerprint_base = BrowserFingerprint._get_desktop()
+            fingerprint_base = BrowserFingerprint._get_desktop(rng)
 
-        locale, timezone, country_name = BrowserFingerprint._get_country_data(country)
+        locale, timezone, country_name = BrowserFingerprint._get_country_data(country, rng)
         
-        fingerprint = {
+        return Fingerprint(
             **fingerprint_base,
-            "locale": locale,
-            "timezone_id": timezone,
-            "country": country_name,
-            "color_scheme": choice(BrowserFingerprint.COLOR_SCHEMES),
-            "reduced_motion": choice(BrowserFingerprint.REDUCED_MOTION_PREFERENCES),
-        }
-
-        if age_range:
-            fingerprint["age"] = randint(*age_range)
-
-        return fingerprint
+            locale=locale,
+            timezone_id=timezone,
+            country=country_name,
+            color_scheme=rng.choice(BrowserFingerprint.COLOR_SCHEMES),
+            reduced_motion=rng.choice(BrowserFingerprint.REDUCED_MOTION_PREFERENCES),
+            age=rng.randint(*age_range) if age_range else None,
+        )
 
     @staticmethod
-    def _get_country_data(country_name: Optional[str] = None) -> Tuple[str, str, str]:
+    def _get_country_data(country_name: Optional[str] = None, rng: Any = random) -> Tuple[str, str, str]:
         """Get locale, timezone, and country name for a specific or random country."""
-        if country_name and country_name in BrowserFingerprint.COUNTRY_DATA:
-            country_info = BrowserFingerprint.COUNTRY_DATA[country_name]
-        else:
-            countries, weights = zip(*[(k, v["weight"]) for k, v in BrowserFingerprint.COUNTRY_DATA.items()])
-            country_name = choices(countries, weights=weights, k=1)[0]
-            country_info = BrowserFingerprint.COUNTRY_DATA[country_name]
+        if not (country_name and country_name in BrowserFingerprint.COUNTRY_PAIRS):
+            country_name = BrowserFingerprint.COUNTRY_NAMES[BrowserFingerprint._sample_country_index(rng)]
+
+        pairs = BrowserFingerprint.COUNTRY_PAIRS[country_name]
+        locale, timezone = pairs[rng.randrange(len(pairs))] if len(pairs) > 1 else pairs[0]
 
-        locale = choice(country_info["locales"])
-        timezone = choice(country_info["timezones"])
-        
         return locale, timezone, country_name
 
     @staticmethod
-    def _get_desktop() -> dict:
-        os_name, os_details = choice(list(BrowserFingerprint.DESKTOP_OS_FINGERPRINTS.items()))
+    def _sample_country_index(rng: Any = random) -> int:
+        """Draws a COUNTRY_DATA index by weight from the precomputed alias table."""
+        u = rng.random() * len(BrowserFingerprint.COUNTRY_NAMES)
+        index = int(u)
+        return index if u - index < BrowserFingerprint.COUNTRY_PROB[index] else BrowserFingerprint.COUNTRY_ALIAS[index]
+
+    @staticmethod
+    def _get_desktop(rng: Any = random) -> dict:
+        randrange, randint = rng.randrange, rng.randint
+        items = BrowserFingerprint.DESKTOP_OS_ITEMS
+        os_name, os_details = items[randrange(len(items))]
+        user_agents = os_details["user_agents"]
+        viewports = os_details["viewports"]
         return {
             "device_name": os_name,
-            "user_agent": choice(os_details["user_agents"]),
-            "viewport": choice(os_details["viewports"]),
+            "user_agent": user_agents[randrange(len(user_agents))],
+            "viewport": viewports[randrange(len(viewports))],
             "is_mobile": False,
             "has_touch": False,
             "device_scale_factor": 1,
@@ -175,9 +247,12 @@ class BrowserFingerprint:
         }
 
     @staticmethod
-    def _get_mobile() -> dict:
-        brand, details = choice(list(BrowserFingerprint.MOBILE_FINGERPRINTS.items()))
-        device_info = choice(details["devices"])
+    def _get_handheld(items: tuple, rng: Any = random) -> dict:
+        """Builds a touch-device fingerprint from MOBILE_ITEMS or TABLET_ITEMS."""
+        randrange, randint = rng.randrange, rng.randint
+        details = items[randrange(len(items))]
+        devices = details["devices"]
+        device_info = devices[randrange(len(devices))]
         return {
             "device_name": device_info["name"],
             "user_agent": device_info["user_agent"],
@@ -190,28 +265,21 @@ class BrowserFingerprint:
         }
 
     @staticmethod
-    def _get_tablet() -> dict:
-        brand, details = choice(list(BrowserFingerprint.TABLET_FINGERPRINTS.items()))
-        device_info = choice(details["devices"])
-        return {
-            "device_name": device_info["name"],
-            "user_agent": device_info["user_agent"],
-            "viewport": device_info["viewport"],
-            "is_mobile": True,
-            "has_touch": True,
-            "device_scale_factor": device_info["pixel_ratio"],
-            "hardware_concurrency": randint(*details["hardware_concurrency_range"]),
-            "device_memory": randint(*details["device_memory_range"]),
-        }
+    def _get_mobile(rng: Any = random) -> dict:
+        return BrowserFingerprint._get_handheld(BrowserFingerprint.MOBILE_ITEMS, rng)
+
+    @staticmethod
+    def _get_tablet(rng: Any = random) -> dict:
+        return BrowserFingerprint._get_handheld(BrowserFingerprint.TABLET_ITEMS, rng)
 
     @staticmethod
     def add_realistic_delays() -> dict:
         return {
-            "typing_delay": randint(50, 150),
-            "click_delay": randint(100, 300),
-            "scroll_delay": uniform(0.5, 2.0),
-            "page_load_wait_min": uniform(2.0, 5.0),
-            "page_load_wait_max": uniform(5.0, 10.0),
-            "interaction_pause": uniform(1.0, 3.0),
-            "human_pause": uniform(0.5, 1.5),
+            "typing_delay": random.randint(50, 150),
+            "click_delay": random.randint(100, 300),
+            "scroll_delay": random.uniform(0.5, 2.0),
+            "page_load_wait_min": random.uniform(2.0, 5.0),
+            "page_load_wait_max": random.uniform(5.0, 10.0),
+            "interaction_pause": random.uniform(1.0, 3.0),
+            "human_pause": random.uniform(0.5, 1.5),
         }
@@ -1,16 +1,23 @@
 import asyncio
+import hashlib
+import json
 import logging
+import mmap
 import os
+import tempfile
+import threading
 import time
 import traceback
-from random import choice, choices, randint, uniform
-from typing import Optional, Dict, Any, Tuple
+from functools import cached_property, lru_cache
+from pathlib import Path
+from random import Random
+from typing import Optional, Dict, Any, List, Tuple, Callable
 
+import numpy as np
 from playwright.async_api import (
     Browser,
     BrowserContext,
     Error as PlaywrightError,
-    Playwright,
     TimeoutError as PlaywrightTimeoutError,
     async_playwright,
 )
@@ -21,16 +28,83 @@ from .fingerprint import BrowserFingerprint
 
 logger = logging.getLogger(__name__)
 
+INIT_SCRIPT_TEMPLATE = (
+    "Object.defineProperty(navigator, 'webdriver', { get: () => undefined });\n"
+    "Object.defineProperty(navigator, 'hardwareConcurrency', { get: () => %d });\n"
+    "Object.defineProperty(navigator, 'deviceMemory', { get: () => %d });\n"
+)
+
+
+@lru_cache(maxsize=128)
+def build_init_script(hardware_concurrency: int, device_memory: int) -> str:
+    """Renders the navigator-override init script; the value ranges are small, so results are cached."""
+    return INIT_SCRIPT_TEMPLATE % (hardware_concurrency, device_memory)
+
+
+# Shared across contexts: Playwright only serializes these, so one instance per value is enough.
+GEOLOCATION_PERMISSIONS = ["geolocation"]
+
+
+@lru_cache(maxsize=None)
+def referer_headers(referrer: str) -> Dict[str, str]:
+    """Returns the extra_http_headers dict for a referrer; there is one per configured source."""
+    return {"Referer": referrer}
+
+
+# Age distribution buckets mapped to the concrete age range used for fingerprints.
+AGE_RANGES = {
+    "18-24": (18, 24), "25-34": (25, 34), "35-44": (35, 44),
+    "45-54": (45, 54), "55+": (55, 75), "18-75": (18, 75),
+}
+
+
+def sample_column(rng: np.random.Generator, weights: Tuple[List[Any], List[int]], n: int) -> List[Any]:
+    """Draws n values from a (population, cumulative weights) pair in a single vectorized call."""
+    population, cum_weights = weights
+    probabilities = np.diff(cum_weights, prepend=0).astype(float)
+    probabilities /= probabilities.sum()
+    # Filled item by item so tuple values stay scalars instead of becoming array rows.
+    values = np.empty(len(population), dtype=object)
+    for i, value in enumerate(population):
+        values[i] = value
+    return values[rng.choice(len(population), size=n, p=probabilities)].tolist()
+
 
 class AdvancedTrafficGenerator:
     """Main class for running traffic simulations."""
 
-    def __init__(self, config: TrafficConfig):
+    def __init__(
+        self,
+        config: TrafficConfig,
+        on_stats: Optional[Callable[[Dict[str, Any]], None]] = None,
+        stats_interval: float = 0.5,
+    ):
         self.config = config
-        self.behavior_simulator = IntelligentBehaviorSimulator(config, mode_type=config.mode_type)
-        self.semaphore = asyncio.Semaphore(config.max_concurrent)
-        self.proxies = self._load_proxies()
+        self.on_stats = on_stats
+        self.stats_interval = stats_interval
+        # Raw server strings; the {"server": ...} dict is only built for the proxy a session picks.
+        self.proxy_servers = self._load_proxies()
+        # Sizes of the per-session pick lists, so each pick is a single randrange index.
+        self.proxy_count = len(self.proxy_servers)
+        self.referrer_count = len(config.referrer_sources) if config.referrer_sources else 0
+        self.persona_count = len(config.personas)
         self.stop_event = asyncio.Event()
+        # The loop run() is executing on. asyncio.Event is not thread-safe, so stop() hands the set()
+        # to this loop when called from another thread; stop_lock orders that against run() start-up.
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.stop_lock = threading.Lock()
+        self.profile_dir = config.project_root / "output" / "profiles"
+        self.profile_dir.mkdir(parents=True, exist_ok=True)
+        self.profile_cache: Optional[List[str]] = None
+        # Per-session demographic columns indexed by session_id - 1, filled by _pregenerate_demographics.
+        self.sampled_demographics: Dict[str, List[Any]] = {}
+        # Digest of the last storage state written per profile, to skip rewriting unchanged state.
+        self.state_hashes: Dict[str, bytes] = {}
+        # One Chromium process per run, launched in run(); sessions get their own contexts on it.
+        self.browser: Optional[Browser] = None
+        self.playwright = None
+        # Serializes relaunches so sessions that notice a dead browser together start only one.
+        self.browser_lock = asyncio.Lock()
         self.session_stats = {
             "total": 0,
             "successful": 0,
@@ -38,18 +112,35 @@ class AdvancedTrafficGenerator:
             "completed": 0,
             "total_duration": 0.0,
         }
+        # Incremented on every stats change so readers can tell when a cached snapshot is stale.
+        self.stats_version = 0
+
+    @cached_property
+    def behavior_simulator(self) -> IntelligentBehaviorSimulator:
+        """Built on first use by a session, so generators that never run or stop early skip its setup."""
+        return IntelligentBehaviorSimulator(self.config, mode_type=self.config.mode_type)
 
     def _log(self, message: str, level: str = "info", **kwargs):
         """Logs a message to the logger."""
         getattr(logger, level, logger.info)(message, **kwargs)
 
-    def _load_proxies(self) -> list:
-        """Loads a list of proxies from the provided file."""
+    def _bump_stat(self, key: str, amount: float = 1):
+        """Increments a session stat and marks the stats as changed."""
+        self.session_stats[key] += amount
+        self.stats_version += 1
+
+    def _load_proxies(self) -> List[str]:
+        """Loads the proxy server addresses from the provided file, one per line."""
         if not self.config.proxy_file:
             return []
         try:
-            with open(self.config.proxy_file) as f:
-                return [{"server": line.strip()} for line in f if line.strip()]
+            with open(self.config.proxy_file, "rb") as f:
+                if os.fstat(f.fileno()).st_size == 0:
+                    return []
+                # Split the whole mapped file in C instead of iterating line by line in Python.
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    lines = mm[:].splitlines()
+            return [server for server in (line.strip().decode() for line in lines) if server]
         except FileNotFoundError:
             self._log(f"Proxy file not found: {self.config.proxy_file}", level="error")
             return []
@@ -57,92 +148,121 @@ class AdvancedTrafficGenerator:
             self._log(f"Failed to load proxies: {e}", level="error", exc_info=True)
             return []
 
-    def _get_demographics(self) -> Dict[str, Any]:
-        """Determines the demographic profile for a session."""
-        devices, device_weights = zip(*self.config.device_distribution.items())
-        countries, country_weights = zip(*self.config.country_distribution.items())
-        age_groups, age_weights = zip(*self.config.age_distribution.items())
-        genders, gender_weights = zip(*self.config.gender_distribution.items())
-
-        age_map = {
-            "18-24": (18, 24), "25-34": (25, 34), "35-44": (35, 44),
-            "45-54": (45, 54), "55+": (55, 75), "18-75": (18, 75),
+    def _pregenerate_demographics(self, n: int):
+        """Samples the demographics of all n sessions up front, one vectorized draw per attribute."""
+        rng = np.random.default_rng()
+        age_groups, age_weights = self.config.age_weights
+        age_ranges = [AGE_RANGES.get(group, (18, 65)) for group in age_groups]
+        self.sampled_demographics = {
+            "device_type": sample_column(rng, self.config.device_weights, n),
+            "country": sample_column(rng, self.config.country_weights, n),
+            "age_range": sample_column(rng, (age_ranges, age_weights), n),
+            "gender": sample_column(rng, self.config.gender_weights, n),
         }
-        selected_age_group = choices(age_groups, weights=age_weights, k=1)[0]
 
-        return {
-            "device_type": choices(devices, weights=device_weights, k=1)[0],
-            "country": choices(countries, weights=country_weights, k=1)[0],
-            "age_range": age_map.get(selected_age_group, (18, 65)),
-            "gender": choices(genders, weights=gender_weights, k=1)[0],
-        }
+    def _get_demographics(self, session_id: int) -> Dict[str, Any]:
+        """Returns the pre-sampled demographic profile for a session."""
+        index = session_id - 1
+        return {key: column[index] for key, column in self.sampled_demographics.items()}
 
-    def _get_user_profile(self, demographics: Dict[str, Any]) -> Tuple[str, str]:
+    def _get_user_profile(self, demographics: Dict[str, Any], rng: Random) -> Tuple[str, str]:
         """Determines the user profile for a session (new or returning)."""
-        is_returning = uniform(0, 100) < self.config.returning_visitor_rate
-        profile_dir = self.config.project_root / "output" / "profiles"
-        profile_dir.mkdir(parents=True, exist_ok=True)
+        is_returning = rng.uniform(0, 100) < self.config.returning_visitor_rate
+        if self.profile_cache is None:
+            # Scanned once per run; later sessions see new profiles through the in-memory list.
+            with os.scandir(self.profile_dir) as entries:
+                self.profile_cache = [e.name for e in entries if e.is_dir(follow_symlinks=False)]
+
+        if is_returning and self.profile_cache:
+            return "Returning", rng.choice(self.profile_cache)
         
-        existing_profiles = [d.name for d in profile_dir.iterdir() if d.is_dir()]
-
-        if is_returning and existing_profiles:
-            return "Returning", choice(existing_profiles)
-        
-        return "New", f"user_{int(time.time())}_{randint(1000, 9999)}"
+        # No await between the read above and this append, so concurrent sessions cannot interleave here.
+        profile_id = f"user_{int(time.time())}_{rng.randint(1000, 9999)}"
+        self.profile_cache.append(profile_id)
+        return "New", profile_id
 
     async def _create_browser_context(
         self,
-        playwright: Playwright,
         profile_id: str,
         demographics: Dict[str, Any],
+        is_new_profile: bool,
+        rng: Random,
     ) -> Optional[BrowserContext]:
-        """Creates a browser context with a specific profile and fingerprint."""
-        browser = None
+        """Creates a browser context on the shared browser with a specific profile and fingerprint."""
+        context = None
         try:
-            profile_path = self.config.project_root / "output" / "profiles" / profile_id
-            profile_path.mkdir(exist_ok=True)
+            profile_path = self.profile_dir / profile_id
+            # Returning profiles already have their directory; only new ones need the mkdir.
+            if is_new_profile:
+                profile_path.mkdir(exist_ok=True)
 
             fingerprint = BrowserFingerprint.get_random_fingerprint(
-                demographics["device_type"], demographics["country"], demographics["age_range"]
+                demographics["device_type"], demographics["country"], demographics["age_range"], rng
             )
 
-            context_args = {
-                k: v for k, v in fingerprint.items() 
-                if k in ["user_agent", "viewport", "locale", "timezone_id", "is_mobile", 
-                         "has_touch", "device_scale_factor", "color_scheme", "reduced_motion"]
-            }
-            context_args["permissions"] = ["geolocation"]
-            if self.config.referrer_sources:
-                context_args["extra_http_headers"] = {"Referer": choice(self.config.referrer_sources)}
+            context_args = fingerprint.context_args()
+            context_args["permissions"] = GEOLOCATION_PERMISSIONS
+            if self.referrer_count:
+                referrer = self.config.referrer_sources[rng.randrange(self.referrer_count)]
+                context_args["extra_http_headers"] = referer_headers(referrer)
 
             state_path = profile_path / "state.json"
-            if state_path.exists():
+            if not is_new_profile and state_path.exists():
                 context_args["storage_state"] = str(state_path)
 
-            proxy = choice(self.proxies) if self.proxies else None
+            proxy = {"server": self.proxy_servers[rng.randrange(self.proxy_count)]} if self.proxy_count else None
             
-            browser = await playwright.chromium.launch(headless=self.config.headless, proxy=proxy)
-            context = await browser.new_context(**context_args)
+            # Contexts are isolated (cookies, storage, proxy), so they all share one browser process.
+            browser = await self._ensure_browser()
+            context = await browser.new_context(proxy=proxy, **context_args)
 
             if self.config.network_type == "Offline":
                 await context.set_offline(True)
 
-            init_script = f"""
-                Object.defineProperty(navigator, 'webdriver', {{ get: () => undefined }});
-                Object.defineProperty(navigator, 'hardwareConcurrency', {{ get: () => {fingerprint.get("hardware_concurrency", 4)} }});
-                Object.defineProperty(navigator, 'deviceMemory', {{ get: () => {fingerprint.get("device_memory", 8)} }});
-            """
-            await context.add_init_script(init_script)
-            
-            # Attach browser to context for easier cleanup
-            context.browser = browser
+            await context.add_init_script(
+                build_init_script(fingerprint.hardware_concurrency, fingerprint.device_memory)
+            )
             return context
         except Exception as e:
             self._log(f"Failed to create context for {profile_id}: {e}", level="error", exc_info=True)
-            if browser:
-                await browser.close()
+            if context:
+                await context.close()
             return None
 
+    async def _ensure_browser(self) -> Browser:
+        """Returns the shared browser, relaunching it first if it crashed or disconnected mid-run."""
+        if self.browser.is_connected():
+            return self.browser
+        async with self.browser_lock:
+            if not self.browser.is_connected():
+                self._log("Browser disconnected, relaunching...", level="warning")
+                self.browser = await self.playwright.chromium.launch(headless=self.config.headless)
+        return self.browser
+
+    def _save_storage_state(self, profile_id: str, storage_path: Path, state: Dict[str, Any]):
+        """Writes a profile's storage state, skipping the write when it matches what is on disk.
+
+        Blocking (hashing and file I/O), so sessions run it through asyncio.to_thread.
+        """
+        data = json.dumps(state, sort_keys=True).encode()
+        digest = hashlib.blake2b(data, digest_size=16).digest()
+        known_digest = self.state_hashes.get(profile_id)
+        if known_digest is None and storage_path.exists():
+            known_digest = hashlib.blake2b(storage_path.read_bytes(), digest_size=16).digest()
+        if digest == known_digest:
+            return
+
+        # Write to a temp file and rename so a concurrent reader never sees a half-written state.
+        # The temp name is unique because simulations running in parallel share the profiles directory.
+        with tempfile.NamedTemporaryFile(dir=storage_path.parent, prefix="state.", suffix=".tmp", delete=False) as tmp:
+            tmp.write(data)
+        try:
+            os.replace(tmp.name, storage_path)
+        except OSError:
+            os.unlink(tmp.name)
+            raise
+        self.state_hashes[profile_id] = digest
+
     async def _execute_session_logic(
         self, context: BrowserContext, persona: Persona, profile_id: str
     ) -> Dict[str, Any]:
@@ -151,115 +271,178 @@ class AdvancedTrafficGenerator:
         try:
             await page.goto(
                 self.config.target_url,
-                wait_until="domcontentloaded",
+                wait_until=self.config.wait_until,
                 timeout=self.config.navigation_timeout,
             )
-            await page.wait_for_load_state("networkidle", timeout=self.config.navigation_timeout)
+            if self.config.networkidle_timeout:
+                # Best effort only: chatty sites may never go idle, so a short bound is not a failure.
+                try:
+                    await page.wait_for_load_state("networkidle", timeout=self.config.networkidle_timeout)
+                except PlaywrightTimeoutError:
+                    pass
 
             goal_result = await self.behavior_simulator.run_goal_oriented_session(page, persona)
             
-            storage_path = self.config.project_root / "output" / "profiles" / profile_id / "state.json"
-            await context.storage_state(path=str(storage_path))
+            storage_path = self.profile_dir / profile_id / "state.json"
+            state = await context.storage_state()
+            await asyncio.to_thread(self._save_storage_state, profile_id, storage_path, state)
             
             return goal_result
         finally:
             await page.close()
 
-    async def _run_single_session(self, playwright: Playwright, session_id: int):
+    async def _run_single_session(self, session_id: int, rng: Random):
         """Orchestrates a single session, including setup, execution, and cleanup."""
-        if self.stop_event.is_set():
+        # Bound once per session; these are looked up on every attempt and log line below.
+        stop_requested = self.stop_event.is_set
+        bump_stat = self._bump_stat
+        log = self._log
+        simulator = self.behavior_simulator
+        max_retries = self.config.max_retries_per_session
+
+        if stop_requested():
             return
 
-        async with self.semaphore:
-            if self.stop_event.is_set():
+        bump_stat("total")
+        start_time = time.perf_counter()
+        
+        demographics = self._get_demographics(session_id)
+        visitor_type, profile_id = self._get_user_profile(demographics, rng)
+        
+        persona = self.config.personas[rng.randrange(self.persona_count)]
+
+        log_prefix = (f"Session {session_id:03d} "
+                      f"[{visitor_type[0]}/{demographics['device_type']}/{persona.name}/"
+                      f"{demographics['gender']}/{demographics['age_range'][0]}-{demographics['age_range'][1]}/"
+                      f"{demographics['country']}]")
+
+        session_status = "failed"
+        goal_result = {}
+        context = None
+
+        for attempt in range(max_retries + 1):
+            if stop_requested():
+                break
+            try:
+                log(f"{log_prefix}: Starting (Attempt {attempt + 1})")
+                context = await self._create_browser_context(profile_id, demographics, visitor_type == "New", rng)
+                if not context:
+                    raise PlaywrightError("Context creation failed.")
+                await simulator.install_routes(context, persona)
+                await simulator.install_vitals_observer(context, persona)
+
+                goal_result = await self._execute_session_logic(context, persona, profile_id)
+                
+                session_status = "successful"
+                bump_stat("successful")
+                log(f"{log_prefix}: Success (duration: {time.perf_counter() - start_time:.1f}s)")
+                break 
+            except (PlaywrightTimeoutError, PlaywrightError) as e:
+                msg = str(e).splitlines()[0]
+                log(f"{log_prefix}: Attempt {attempt + 1} failed - {type(e).__name__}: {msg}", level="warning")
+                if attempt >= max_retries:
+                    bump_stat("failed")
+                    log(f"{log_prefix}: Max retries reached.", level="error")
+            except Exception:
+                bump_stat("failed")
+                log(f"{log_prefix}: Critical failure.", level="error", exc_info=True)
+                break
+            finally:
+                if context:
+                    await context.close()
+                    context = None
+
+        duration = time.perf_counter() - start_time
+        if session_status == "successful":
+            bump_stat("total_duration", duration)
+
+        bump_stat("completed")
+
+    async def _session_worker(self, queue: asyncio.Queue):
+        """Runs queued sessions one at a time until the queue is drained or a stop is requested."""
+        # A private generator per worker keeps session draws off the shared module-level Random.
+        rng = Random()
+        while not self.stop_event.is_set():
+            try:
+                session_id = queue.get_nowait()
+            except asyncio.QueueEmpty:
                 return
-
-            self.session_stats["total"] += 1
-            start_time = time.time()
-            
-            demographics = self._get_demographics()
-            visitor_type, profile_id = self._get_user_profile(demographics)
-            
-            persona = choice(self.config.personas)
-            persona.gender = demographics["gender"]
-            persona.age_range = demographics["age_range"]
-
-            log_prefix = (f"Session {session_id:03d} "
-                          f"[{visitor_type[0]}/{demographics['device_type']}/{persona.name}/"
-                          f"{persona.gender}/{demographics['age_range'][0]}-{demographics['age_range'][1]}/"
-                          f"{demographics['country']}]")
-
-            session_status = "failed"
-            goal_result = {}
-            context = None
-
-            for attempt in range(self.config.max_retries_per_session + 1):
-                if self.stop_event.is_set():
-                    break
+            await self._run_single_session(session_id, rng)
+
+    async def _publish_stats(self):
+        """Pushes a stats snapshot to on_stats at most once per stats_interval, skipping unchanged ticks."""
+        published_version = self.stats_version
+        while True:
+            await asyncio.sleep(self.stats_interval)
+            if self.stats_version != published_version:
+                published_version = self.stats_version
                 try:
-                    self._log(f"{log_prefix}: Starting (Attempt {attempt + 1})")
-                    context = await self._create_browser_context(playwright, profile_id, demographics)
-                    if not context:
-                        raise PlaywrightError("Context creation failed.")
-
-                    goal_result = await self._execute_session_logic(context, persona, profile_id)
-                    
-                    session_status = "successful"
-                    self.session_stats["successful"] += 1
-                    self._log(f"{log_prefix}: Success (duration: {time.time() - start_time:.1f}s)")
-                    break 
-                except (PlaywrightTimeoutError, PlaywrightError) as e:
-                    msg = str(e).splitlines()[0]
-                    self._log(f"{log_prefix}: Attempt {attempt + 1} failed - {type(e).__name__}: {msg}", level="warning")
-                    if attempt >= self.config.max_retries_per_session:
-                        self.session_stats["failed"] += 1
-                        self._log(f"{log_prefix}: Max retries reached.", level="error")
-                except Exception:
-                    self.session_stats["failed"] += 1
-                    self._log(f"{log_prefix}: Critical failure.", level="error", exc_info=True)
-                    break
-                finally:
-                    if context:
-                        await context.browser.close()
-
-            duration = time.time() - start_time
-            if session_status == "successful":
-                self.session_stats["total_duration"] += duration
-
-            self.session_stats["completed"] += 1
+                    self.on_stats(dict(self.session_stats))
+                except Exception as e:
+                    self._log(f"Failed to publish stats: {e}", level="warning")
 
     async def run(self):
         """Triggers the execution of all configured sessions with responsive stop functionality."""
         self._log("Starting generator process...")
-        start_time = time.time()
+        start_time = time.perf_counter()
+        with self.stop_lock:
+            self.loop = asyncio.get_running_loop()
+        stats_task = asyncio.create_task(self._publish_stats()) if self.on_stats else None
         
-        async with async_playwright() as playwright:
-            tasks = [
-                asyncio.create_task(self._run_single_session(playwright, i + 1))
-                for i in range(self.config.total_sessions)
-            ]
-            
-            # Wait for tasks to complete or for the stop event to be set
-            await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
-
-            # If stop was triggered, cancel remaining tasks
-            if self.stop_event.is_set():
-                self._log("Stop command received, cancelling running sessions...", level="warning")
-                for task in tasks:
-                    if not task.done():
-                        task.cancel()
-                # Wait for cancellations to propagate
-                await asyncio.gather(*tasks, return_exceptions=True)
-
-        total_duration = time.time() - start_time
+        try:
+            async with async_playwright() as playwright:
+                self.playwright = playwright
+                self.browser = await playwright.chromium.launch(headless=self.config.headless)
+                try:
+                    # max_concurrent long-lived workers pull session ids, so only that many tasks exist at once.
+                    self._pregenerate_demographics(self.config.total_sessions)
+                    queue = asyncio.Queue()
+                    for session_id in range(1, self.config.total_sessions + 1):
+                        queue.put_nowait(session_id)
+                    workers = [
+                        asyncio.create_task(self._session_worker(queue))
+                        for _ in range(self.config.max_concurrent)
+                    ]
+                    # One future for all workers raced against the stop event, so no per-completion rescans.
+                    all_workers = asyncio.gather(*workers, return_exceptions=True)
+                    stop_requested = asyncio.create_task(self.stop_event.wait())
+                    await asyncio.wait({all_workers, stop_requested}, return_when=asyncio.FIRST_COMPLETED)
+                    stop_requested.cancel()
+
+                    # If stop was triggered, cancel the running sessions
+                    if self.stop_event.is_set() and not all_workers.done():
+                        self._log("Stop command received, cancelling running sessions...", level="warning")
+                        for worker in workers:
+                            worker.cancel()
+                    # Wait for cancellations to propagate
+                    for result in await all_workers:
+                        if isinstance(result, Exception):
+                            self._log(f"Session worker crashed: {result}", level="error")
+                finally:
+                    await self.browser.close()
+                    self.browser = None
+                    self.playwright = None
+        finally:
+            if stats_task:
+                stats_task.cancel()
+            with self.stop_lock:
+                self.loop = None
+
+        total_duration = time.perf_counter() - start_time
         self._log(f"All sessions have been completed or stopped in {total_duration:.2f} seconds.")
-        avg_duration = (self.session_stats['total_duration'] / self.session_stats['successful']) if self.session_stats['successful'] > 0 else 0
-        self._log(f"Run stats: {self.session_stats['successful']} successful, "
-                  f"{self.session_stats['failed']} failed. "
+        stats = self.session_stats
+        avg_duration = (stats['total_duration'] / stats['successful']) if stats['successful'] > 0 else 0
+        self._log(f"Run stats: {stats['successful']} successful, "
+                  f"{stats['failed']} failed. "
                   f"Avg session duration: {avg_duration:.2f}s")
 
     def stop(self):
-        """Signals the generator to stop all running sessions gracefully."""
+        """Signals the generator to stop all running sessions gracefully. Safe to call from any thread."""
         if not self.stop_event.is_set():
             self._log("Stop signal received. Gracefully shutting down...", level="info")
-            self.stop_event.set()
+            with self.stop_lock:
+                if self.loop is None or self.loop.is_closed():
+                    # Not running yet (or finished): nothing is waiting, and run() will see the flag.
+                    self.stop_event.set()
+                else:
+                    self.loop.call_soon_threadsafe(self.stop_event.set)
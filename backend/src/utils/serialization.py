@@ -0,0 +1,53 @@
+# File: src/utils/serialization.py
+
+import decimal
+import uuid
+from datetime import date
+from typing import Any
+
+import orjson
+from flask.json.provider import JSONProvider
+from werkzeug.http import http_date
+
+# Datetimes are passed through to _default so they keep Flask's HTTP-date format.
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+
+
+def _default(o: Any) -> Any:
+    """Encodes the types Flask's default provider supports but orjson does not handle the same way."""
+    if isinstance(o, date):
+        return http_date(o)
+    if isinstance(o, (decimal.Decimal, uuid.UUID)):
+        return str(o)
+    if hasattr(o, "__html__"):
+        return str(o.__html__())
+    raise TypeError(f"Object of type {type(o).__name__} is not JSON serializable")
+
+
+def dumps_bytes(obj: Any) -> bytes:
+    """Serializes an object to compact JSON bytes."""
+    return orjson.dumps(obj, default=_default, option=ORJSON_OPTIONS)
+
+
+def dumps(obj: Any, **kwargs) -> str:
+    """json.dumps-compatible wrapper; formatting kwargs are ignored since output is always compact."""
+    return dumps_bytes(obj).decode()
+
+
+def loads(s: Any, **kwargs) -> Any:
+    """json.loads-compatible wrapper around orjson.loads."""
+    return orjson.loads(s)
+
+
+class OrjsonProvider(JSONProvider):
+    """Flask JSON provider that serializes with orjson, used by jsonify and app.json."""
+
+    def dumps(self, obj: Any, **kwargs) -> str:
+        return dumps(obj)
+
+    def loads(self, s: Any, **kwargs) -> Any:
+        return loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(dumps_bytes(obj), mimetype="application/json")
@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# Tests import app and src the same way gunicorn does, from the backend directory.
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
@@ -0,0 +1,80 @@
+from src.core.behavior import find_and_click_selector
+
+
+def test_find_and_click_selector_keeps_non_ascii_text():
+    selector = find_and_click_selector("télécharger|下载")
+    assert selector == 'a:text-matches("télécharger|下载", "i"), button:text-matches("télécharger|下载", "i")'
+    assert "\\u" not in selector
+
+
+def test_find_and_click_selector_escapes_quotes():
+    assert find_and_click_selector('say "hi"').startswith('a:text-matches("say \\"hi\\"", "i")')
+
+
+def test_web_vitals_personas_load_every_resource(tmp_path):
+    import asyncio
+
+    from src.core.behavior import IntelligentBehaviorSimulator
+    from src.core.config import DEFAULT_PERSONAS, TrafficConfig
+
+    class Context:
+        def __init__(self):
+            self.routes = []
+
+        async def route(self, pattern, handler):
+            self.routes.append(pattern)
+
+    config = TrafficConfig(project_root=tmp_path, target_url="https://example.com", total_sessions=1,
+                           max_concurrent=1, personas=DEFAULT_PERSONAS)
+    simulator = IntelligentBehaviorSimulator(config)
+    analyst = next(p for p in DEFAULT_PERSONAS if (p.goal or {}).get("type") == "collect_web_vitals")
+    browser = next(p for p in DEFAULT_PERSONAS if not p.goal)
+
+    vitals_context, browsing_context = Context(), Context()
+    asyncio.run(simulator.install_routes(vitals_context, analyst))
+    asyncio.run(simulator.install_routes(browsing_context, browser))
+
+    assert vitals_context.routes == []
+    assert browsing_context.routes == ["**/*"]
+
+
+def test_form_submit_waits_for_the_persona_load_state(tmp_path):
+    import asyncio
+
+    from src.core.behavior import IntelligentBehaviorSimulator
+    from src.core.config import DEFAULT_PERSONAS, Persona, TrafficConfig
+
+    class Locator:
+        first = property(lambda self: self)
+
+        def locator(self, selector):
+            return self
+
+        def nth(self, index):
+            return self
+
+        async def evaluate_all(self, script):
+            return [{"index": 0, "name": "email", "type": "email", "tag": "input"}]
+
+        async def fill(self, value, timeout=None):
+            pass
+
+        async def click(self, timeout=None, delay=None):
+            pass
+
+    class Page:
+        def __init__(self):
+            self.waits = []
+
+        async def wait_for_load_state(self, state, timeout=None):
+            self.waits.append((state, timeout))
+
+    config = TrafficConfig(project_root=tmp_path, target_url="https://example.com", total_sessions=1,
+                           max_concurrent=1, personas=DEFAULT_PERSONAS)
+    simulator = IntelligentBehaviorSimulator(config)
+    simulator.delays = {"typing_delay": 0, "click_delay": 0}
+    persona = Persona(name="Slow Form Filler", goal={"type": "fill_form", "wait_state": "networkidle"})
+
+    page = Page()
+    assert asyncio.run(simulator._handle_form_interaction(page, persona, Locator()))
+    assert page.waits == [("networkidle", 15000)]
@@ -0,0 +1,53 @@
+import asyncio
+import threading
+import time
+
+import src.core.generator as generator_module
+from src.core.config import DEFAULT_PERSONAS, TrafficConfig
+
+
+class FakeBrowser:
+    def is_connected(self):
+        return True
+
+    async def close(self):
+        pass
+
+
+class FakePlaywright:
+    class chromium:
+        @staticmethod
+        async def launch(**kwargs):
+            return FakeBrowser()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        pass
+
+
+def test_stop_from_another_thread_wakes_the_run(tmp_path, monkeypatch):
+    monkeypatch.setattr(generator_module, "async_playwright", FakePlaywright)
+    config = TrafficConfig(project_root=tmp_path, target_url="https://example.com", total_sessions=4,
+                           max_concurrent=2, personas=DEFAULT_PERSONAS)
+    generator = generator_module.AdvancedTrafficGenerator(config)
+    started = threading.Event()
+
+    async def idle_session(session_id, rng):
+        started.set()
+        await asyncio.sleep(30)
+
+    generator._run_single_session = idle_session
+    # Runs on its own thread and loop, the way app.py drives simulations from the worker pool.
+    runner = threading.Thread(target=lambda: asyncio.new_event_loop().run_until_complete(generator.run()))
+    runner.start()
+    assert started.wait(5)
+    time.sleep(0.2)  # let the loop go idle in its selector
+
+    stopped_at = time.monotonic()
+    generator.stop()
+    runner.join(10)
+
+    assert not runner.is_alive()
+    assert time.monotonic() - stopped_at < 2
@@ -0,0 +1,118 @@
+import re
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+
+import app
+
+MIGRATION = Path(__file__).resolve().parents[2] / "database" / "migrations" / "0000_init.sql"
+
+
+@pytest.fixture
+def db():
+    """An in-memory database holding the simulations table exactly as the migration defines it."""
+    ddl = re.search(r"CREATE TABLE IF NOT EXISTS simulations \(.*?\n\);", MIGRATION.read_text(), re.S).group(0)
+    conn = sqlite3.connect(":memory:")
+    conn.row_factory = sqlite3.Row
+    conn.execute(ddl)
+    yield conn
+    conn.close()
+
+
+def run(conn, sql, params):
+    return conn.execute(sql.replace("%s", "?"), params)
+
+
+def test_status_statements_match_schema(db):
+    run(db, app.SQL_INSERT_SIMULATION, ("sim_1", "{}", "starting", datetime.utcnow()))
+    run(db, app.SQL_UPDATE_SIMULATION_STATUS, ("running", None, None, None, "sim_1"))
+    run(db, app.SQL_UPDATE_SIMULATION_STATUS, ("completed", datetime.utcnow(), '{"total": 1}', None, "sim_1"))
+    # A later update without stats must not clear what was already stored.
+    run(db, app.SQL_UPDATE_SIMULATION_STATUS, ("completed", None, None, None, "sim_1"))
+
+    row = dict(run(db, app.SQL_SELECT_SIMULATION, ("sim_1",)).fetchone())
+    assert row["status"] == "completed"
+    assert row["stats"] == '{"total": 1}'
+    assert row["completed_at"] is not None
+    assert row["created_at"] is not None
+
+
+def test_failed_batch_is_retried_row_by_row(monkeypatch):
+    written = []
+
+    def execute_status_rows(rows):
+        if any(simulation_id == "bad" for simulation_id, _, _ in rows):
+            raise RuntimeError("bad row")
+        written.extend(simulation_id for simulation_id, _, _ in rows)
+
+    monkeypatch.setattr(app, "execute_status_rows", execute_status_rows)
+    rows = [(simulation_id, app.SQL_UPDATE_SIMULATION_STATUS, ()) for simulation_id in ("a", "bad", "b")]
+    app.write_status_updates(rows)
+
+    assert written == ["a", "b"]
+
+
+def test_cached_and_stored_records_share_a_shape(db):
+    created_at, completed_at = datetime(2024, 1, 1, 12, 0), datetime(2024, 1, 1, 12, 5)
+    run(db, app.SQL_INSERT_SIMULATION, ("sim_1", "{}", "starting", created_at))
+    run(db, app.SQL_UPDATE_SIMULATION_STATUS, ("completed", completed_at, '{"total": 3}', None, "sim_1"))
+    stored = app.simulation_record(dict(run(db, app.SQL_SELECT_SIMULATION, ("sim_1",)).fetchone()))
+
+    cached = app.simulation_record({
+        "id": "sim_1",
+        "status": "completed",
+        "created_at": created_at,
+        "completed_at": completed_at,
+        "stats": {"total": 3},
+    })
+
+    assert stored.keys() == cached.keys()
+    assert stored["stats"] == cached["stats"] == {"total": 3}
+    assert stored["error_message"] is cached["error_message"] is None
+
+
+def test_finished_record_is_served_until_its_row_is_committed(monkeypatch):
+    from contextlib import contextmanager
+
+    class Connection:
+        def cursor(self):
+            return self
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc_info):
+            pass
+
+        def executemany(self, sql, params):
+            pass
+
+        def commit(self):
+            pass
+
+    @contextmanager
+    def get_db_connection():
+        yield Connection()
+
+    monkeypatch.setattr(app, "get_db_connection", get_db_connection)
+    monkeypatch.setattr(app, "redis_client", None)
+    # Collected here rather than on the shared queue, which the background writer also drains.
+    queued = []
+    monkeypatch.setattr(app, "queue_status_update", lambda simulation_id, status, **fields: queued.append(
+        (simulation_id, app.SQL_UPDATE_SIMULATION_STATUS, (status, None, None, None, simulation_id))))
+
+    app.finish_simulation(app.simulation_record({
+        "id": "sim_done",
+        "status": "completed",
+        "created_at": datetime(2024, 1, 1, 12, 0),
+        "completed_at": datetime(2024, 1, 1, 12, 5),
+        "stats": {"total": 2},
+    }))
+    # No database round trip is needed while the terminal row is still queued.
+    response = app.app.test_client().get("/api/simulation/sim_done/status")
+    assert response.get_json()["data"]["status"] == "completed"
+
+    app.write_status_updates(queued)
+    assert "sim_done" not in app.finished_simulations